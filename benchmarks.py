@@ -0,0 +1,365 @@
+# Copyright 2017-2020 Kamil Sindi
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmarks of `implements.verify_implementation` on synthetic workloads.
+
+Each workload builds fresh implementation classes, with their own function
+objects so that no memoized signature is reused, and verifies them against
+interfaces which were compiled beforehand. The time per verification is taken
+from the best of several runs, and the peak memory is measured with
+`tracemalloc` in separate runs. The `threads-N` workloads decorate the same
+number of classes from N threads at once, to measure the contention between
+them; their throughput only scales with N on a free-threaded build of Python.
+
+Results are compared to the baseline stored in `benchmarks.json`, and the
+exit status is non-zero if any workload got slower, or uses more memory, than
+the baseline allows. Times are compared relative to a calibration loop timed
+along with them and stored in the baseline, so that a baseline recorded on
+one machine holds on another::
+
+    python benchmarks.py                  # compare with the baseline
+    python benchmarks.py --save           # record a new baseline
+    python benchmarks.py methods-1000     # run some workloads only
+"""
+
+import argparse
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import types
+
+import implements
+from implements import Interface
+
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        'benchmarks.json')
+
+
+def _method(self, a, b=1, *args, c=None, **kwargs):
+    pass
+
+
+def _getter(self):
+    pass
+
+
+def _setter(self, value):
+    pass
+
+
+def copy_function(func, name):
+    """Returns a new function with the code of `func`, named `name`."""
+    copy = types.FunctionType(func.__code__, func.__globals__, name,
+                              func.__defaults__, func.__closure__)
+    copy.__kwdefaults__ = func.__kwdefaults__
+    copy.__qualname__ = name
+    return copy
+
+
+def methods(count):
+    names = ('method_{}'.format(i) for i in range(count))
+    return {name: copy_function(_method, name) for name in names}
+
+
+def properties(count):
+    return {'prop_{}'.format(i): property(copy_function(_getter, 'fget'),
+                                          copy_function(_setter, 'fset'))
+            for i in range(count)}
+
+
+class Descriptor:
+    """A non-data descriptor which must not be invoked by verification."""
+
+    def __get__(self, obj, objtype=None):
+        return self
+
+
+def passthrough(func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return func(*args, **kwargs)
+
+    return wrapper
+
+
+def decorated(func, depth):
+    for _ in range(depth):
+        func = passthrough(func)
+    return func
+
+
+class Workload:
+    """Builds the interfaces once, and fresh implementations for each run
+    with `make`.
+    """
+
+    def __init__(self, name, interfaces, make, runs, count=1):
+        self.name = name
+        self.interfaces = interfaces
+        self.make = make
+        self.runs = runs
+        self.count = count
+
+    def verify(self, classes):
+        for cls in classes:
+            errors = implements.verify_implementation(self.interfaces, cls)
+            assert not errors, errors
+
+    def build(self):
+        return [self.make() for _ in range(self.count)]
+
+    def measure(self):
+        """Returns the time of a verification in the best run, in seconds,
+        and the smallest peak of memory allocated during a run, in bytes.
+        """
+        self.verify([self.make()])  # compiles the interface specs
+        best = float('inf')
+        for _ in range(self.runs):
+            classes = self.build()
+            start = time.perf_counter()
+            self.verify(classes)
+            best = min(best, time.perf_counter() - start)
+        peak = float('inf')
+        for _ in range(min(self.runs, 3)):
+            # the smallest peak leaves out the occasional resize of the
+            # module-level memo tables
+            classes = self.build()
+            tracemalloc.start()
+            try:
+                self.verify(classes)
+                peak = min(peak, tracemalloc.get_traced_memory()[1])
+            finally:
+                tracemalloc.stop()
+        return best / self.count, peak
+
+
+def methods_workload(count):
+    interface_cls = type('Interface{}'.format(count), (Interface,),
+                         methods(count))
+    return Workload(
+        'methods-{}'.format(count), (interface_cls,),
+        lambda: type('Implementation', (), methods(count)),
+        runs=max(3, 3000 // count))
+
+
+def mro_workload(depth=50, width=5):
+    """Interfaces deriving from each other `depth` times, each adding a
+    method, implemented by a class with `width` bases, each deriving from a
+    chain of `depth` mixins.
+    """
+    interface_cls = Interface
+    for level in range(depth):
+        name = 'method_{}'.format(level)
+        interface_cls = type('Level{}'.format(level), (interface_cls,),
+                             {name: copy_function(_method, name)})
+        interface_cls.__qualname__ = interface_cls.__name__
+
+    def make():
+        bases = []
+        for column in range(width):
+            base = object
+            for level in range(depth):
+                base = type('Mixin{}_{}'.format(column, level), (base,),
+                            methods(depth))
+            bases.append(base)
+        return type('Implementation', tuple(bases), {})
+
+    return Workload('mro-deep', (interface_cls,), make, runs=10)
+
+
+def implementations_workload(count=1000):
+    interface_cls = type('Shared', (Interface,), methods(20))
+    return Workload(
+        'implementations-{}'.format(count), (interface_cls,),
+        lambda: type('Implementation', (), methods(20)), runs=3, count=count)
+
+
+def properties_workload(count=200):
+    interface_cls = type('Properties', (Interface,), properties(count))
+
+    def make():
+        namespace = properties(count)
+        namespace.update(('descriptor_{}'.format(i), Descriptor())
+                         for i in range(count))
+        namespace.update(('attribute_{}'.format(i), i) for i in range(count))
+        return type('Implementation', (), namespace)
+
+    return Workload('properties-{}'.format(count), (interface_cls,), make,
+                    runs=20)
+
+
+def decorators_workload(count=100, depth=10):
+    interface_cls = type('Decorated', (Interface,), methods(count))
+
+    def make():
+        return type('Implementation', (), {
+            name: decorated(func, depth)
+            for name, func in methods(count).items()})
+
+    return Workload('decorators-{}x{}'.format(count, depth), (interface_cls,),
+                    make, runs=10)
+
+
+class ThreadedWorkload(Workload):
+    """Decorates the implementations of a run from `threads` threads at
+    once, as when modules are imported concurrently.
+    """
+
+    def __init__(self, name, interfaces, make, runs, count, threads):
+        super().__init__(name, interfaces, make, runs, count)
+        self.threads = threads
+
+    def decorate(self, barrier, classes):
+        barrier.wait()
+        for cls in classes:
+            implements.implements(*self.interfaces)(cls)
+
+    def verify(self, classes):
+        barrier = threading.Barrier(self.threads)
+        threads = [threading.Thread(target=self.decorate,
+                                    args=(barrier, classes[i::self.threads]))
+                   for i in range(self.threads)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for cls in classes:
+            assert implements.get_interfaces(cls) == self.interfaces
+
+
+def threads_workload(threads, count=2000):
+    interface_cls = type('Concurrent', (Interface,), methods(20))
+    return ThreadedWorkload(
+        'threads-{}'.format(threads), (interface_cls,),
+        lambda: type('Implementation', (), methods(20)), runs=3, count=count,
+        threads=threads)
+
+
+def workloads():
+    return [methods_workload(count) for count in (10, 100, 1000, 10000)] + [
+        mro_workload(),
+        implementations_workload(),
+        properties_workload(),
+        decorators_workload(),
+    ] + [threads_workload(threads) for threads in (1, 2, 4, 8)]
+
+
+def _calibration_loop(count=20000):
+    table = {}
+    for i in range(count):
+        key = ('name', i % 97)
+        table[key] = table.get(key, 0) + len(str(i))
+    return table
+
+
+def calibrate(runs=7):
+    """Returns the best time, in seconds, of a fixed loop of dict and string
+    operations, which measures how fast this machine runs Python code.
+    """
+    best = float('inf')
+    for _ in range(runs):
+        start = time.perf_counter()
+        _calibration_loop()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def compare(results, calibration, baseline, tolerance):
+    """Returns the messages describing the regressions of `results`, timed
+    along with `calibration`, over `baseline`, beyond the relative
+    `tolerance`. Baseline times are scaled by the ratio of the calibrations.
+    """
+    scale = calibration / baseline['calibration']
+    regressions = []
+    for name, result in sorted(results.items()):
+        expected = baseline['workloads'].get(name)
+        if expected is None:
+            continue
+        for key, unit, factor in (('seconds', 's', scale), ('peak', 'B', 1)):
+            if result[key] > expected[key] * factor * (1 + tolerance):
+                regressions.append(
+                    '{}: {} went from {:.6g}{} to {:.6g}{}'.format(
+                        name, key, expected[key] * factor, unit,
+                        result[key], unit))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Benchmark implements on synthetic workloads.')
+    parser.add_argument('names', nargs='*', metavar='WORKLOAD',
+                        help='the workloads to run (default: all)')
+    parser.add_argument('--save', action='store_true',
+                        help='store the results as the new baseline')
+    parser.add_argument('--baseline', default=BASELINE,
+                        help='baseline file (default: %(default)s)')
+    parser.add_argument('--tolerance', type=float, default=0.5,
+                        help='relative slowdown allowed over the baseline '
+                             '(default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    implements.configure(mode='strict', background=False, cache_dir='',
+                         enforce=0, budget=0)
+    gil = getattr(sys, '_is_gil_enabled', lambda: True)()
+    print('Python {} ({}), {} CPUs'.format(
+        sys.version.split()[0], 'GIL' if gil else 'free-threaded',
+        os.cpu_count()))
+    calibration = calibrate()
+    print('Calibration loop: {:.1f} us'.format(calibration * 1e6))
+    results = {}
+    for workload in workloads():
+        if args.names and workload.name not in args.names:
+            continue
+        seconds, peak = workload.measure()
+        results[workload.name] = {'seconds': seconds, 'peak': peak}
+        print('{:<24} {:>12.2f} us {:>12.1f} KiB {:>10.0f} classes/s'.format(
+            workload.name, seconds * 1e6, peak / 1024, 1 / seconds))
+    # timed again, keeping the best, as either run may have been disturbed
+    calibration = min(calibration, calibrate())
+
+    if args.save:
+        workloads_baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+            scale = calibration / baseline['calibration']
+            for name, result in baseline['workloads'].items():
+                workloads_baseline[name] = dict(
+                    result, seconds=result['seconds'] * scale)
+        workloads_baseline.update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump({'calibration': calibration,
+                       'workloads': workloads_baseline},
+                      f, indent=2, sort_keys=True)
+            f.write('\n')
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print('No baseline at {}, run with --save'.format(args.baseline))
+        return 0
+    with open(args.baseline) as f:
+        regressions = compare(results, calibration, json.load(f),
+                              args.tolerance)
+    for regression in regressions:
+        print('REGRESSION ' + regression)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -40,8 +40,7 @@ class BaldEagle(Animal):
         return Direction.W
 
 
-@implements(Flyable)
-@implements(Quackable)
+@implements(Flyable, Quackable)
 class MallardDuck(Animal):
     echoes = True
 
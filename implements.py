@@ -12,12 +12,36 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import abc
+import ast
+import builtins
+import contextlib
+import functools
+import importlib
+import importlib.util
 import inspect
+import itertools
+import logging
+import os
+import pkgutil
+import queue
+import re
 import types
+import typing
 import sys
+import threading
+import time
+import weakref
+from collections import namedtuple
+from collections.abc import Mapping
 
 from pkg_resources import get_distribution, DistributionNotFound
 
+try:
+    import annotationlib
+except ImportError:  # Python < 3.14
+    annotationlib = None
+
 
 __title__ = 'implements'
 __author__ = ('Kamil Sindi <ksindi@ksindi.com>, '
@@ -26,55 +50,954 @@ __license__ = 'Apache License, Version 2.0'
 
 
 try:
-    __version__ = get_distribution(__name__).version
+    __version__ = get_distribution(__title__).version
 except DistributionNotFound:
     # package is not installed
     pass
 
 
-__all__ = ['Interface', 'implements']
+__all__ = ['Interface', 'InterfaceMeta', 'implements', 'get_spec',
+           'InterfaceSpec', 'configure', 'get_mode', 'get_config', 'wait',
+           'verify_package', 'VerificationResult', 'check_sources',
+           'CheckDaemon',
+           'get_implementations', 'get_interfaces', 'conforms', 'accepts',
+           'dispatch', 'plugins', 'stats', 'reset_stats', 'add_hook',
+           'remove_hook', 'VerificationEvent', 'ANNOTATIONS', 'Violation',
+           'ImplementationError', 'VerificationFailures']
+
+
+logger = logging.getLogger(__name__)
+
+MODES = ('strict', 'warn', 'off')
+
+ANNOTATIONS = ('exact', 'string', 'resolve')
+
+_config = {
+    'mode': 'strict' if __debug__ else 'off',
+    'background': False,
+    'cache_dir': None,
+    'enforce': 0,
+    'budget': None,
+    'annotations': 'exact',
+}
+
+
+def configure(mode=None, background=None, cache_dir=None, enforce=None,
+              budget=None, annotations=None):
+    """Changes how `implements` behaves for the classes decorated from now on.
+
+    Args:
+        mode (string):
+            One of `MODES`. 'strict' raises `NotImplementedError` on errors,
+            'warn' logs them instead and 'off' turns `implements` into an
+            identity decorator. Defaults to the `IMPLEMENTS_MODE` environment
+            variable, or 'off' when running under `python -O`, or 'strict'.
+        background (bool):
+            If True, decorated classes are queued and verified by a worker
+            thread while the application keeps importing. Failures are
+            raised by `wait()`. Defaults to the `IMPLEMENTS_BACKGROUND`
+            environment variable.
+        cache_dir (string):
+            Directory in which successful verifications are recorded, keyed
+            by a fingerprint of the interfaces and the implementation, so
+            that other processes can skip them. An empty string disables the
+            cache. Defaults to the `IMPLEMENTS_CACHE_DIR` environment
+            variable, or no cache.
+        enforce (int):
+            If N > 0, the methods of classes verified from now on check
+            their arguments and return value against the annotations of the
+            interface, once every N calls. Violations raise `TypeError`, or
+            are logged in 'warn' mode. 0 disables the checks. Defaults to the
+            `IMPLEMENTS_ENFORCE` environment variable, or 0.
+        budget (float):
+            Seconds of cumulative verification time after which a warning
+            listing the slowest classes is logged, once. 0 disables the
+            warning. Defaults to the `IMPLEMENTS_BUDGET` environment
+            variable, or no budget. See `stats`.
+        annotations (string):
+            One of `ANNOTATIONS`, how the annotations of signatures which
+            aren't identical are compared. 'exact' compares them as they
+            are. 'string' compares their text, normalized without evaluating
+            anything: ``List[int]`` and ``'list[int]'`` match. 'resolve'
+            evaluates string annotations, such as those of
+            ``from __future__ import annotations``, and compares the
+            resulting types structurally. Either way annotations are only
+            normalized once a signature doesn't match exactly, and then
+            cached per function. Defaults to the `IMPLEMENTS_ANNOTATIONS`
+            environment variable, or 'exact'.
+    """
+    if mode is not None:
+        if mode not in MODES:
+            raise ValueError(
+                "Unknown mode '{}'. Expected one of: {}"
+                "".format(mode, ", ".join(MODES)))
+        _config['mode'] = mode
+    if background is not None:
+        _config['background'] = bool(background)
+    if cache_dir is not None:
+        _config['cache_dir'] = cache_dir or None
+    if enforce is not None:
+        enforce = int(enforce)
+        if enforce < 0:
+            raise ValueError('enforce must be >= 0, got {}'.format(enforce))
+        _config['enforce'] = enforce
+    if budget is not None:
+        _config['budget'] = float(budget) or None
+    if annotations is not None:
+        if annotations not in ANNOTATIONS:
+            raise ValueError(
+                "Unknown annotations '{}'. Expected one of: {}"
+                "".format(annotations, ", ".join(ANNOTATIONS)))
+        _config['annotations'] = annotations
+
+
+def get_mode():
+    return _config['mode']
+
+
+def get_config():
+    """Returns a copy of the current settings, see `configure`."""
+    return dict(_config)
+
+
+def _env_flag(name):
+    value = os.environ.get(name)
+    if value is None:
+        return None
+    return value.lower() in ('1', 'true', 'yes', 'on')
+
+
+configure(mode=os.environ.get('IMPLEMENTS_MODE') or None,
+          background=_env_flag('IMPLEMENTS_BACKGROUND'),
+          cache_dir=os.environ.get('IMPLEMENTS_CACHE_DIR'),
+          enforce=os.environ.get('IMPLEMENTS_ENFORCE') or None,
+          budget=os.environ.get('IMPLEMENTS_BUDGET') or None,
+          annotations=os.environ.get('IMPLEMENTS_ANNOTATIONS') or None)
+
+
+class InterfaceMeta(abc.ABCMeta):
+    """Metaclass of `Interface`.
+
+    `isinstance` and `issubclass` against an interface are True for the
+    classes verified to implement it, or one of its sub-interfaces, and for
+    their subclasses. Answers are cached per type until the next class is
+    verified.
+
+    It derives from `abc.ABCMeta`, so that interfaces can also derive from
+    `abc.ABC` and register virtual subclasses. The metaclass of an interface
+    which needs another one must derive from both.
+    """
+
+    def __instancecheck__(cls, instance):
+        return cls.__subclasscheck__(type(instance))
+
+    def __subclasscheck__(cls, subclass):
+        if not isinstance(subclass, type):
+            raise TypeError('issubclass() arg 1 must be a class')
+        entry = _conformance.get(subclass)
+        if entry is None or entry[0] != _generation:
+            entry = _conformance[subclass] = (
+                _generation, weakref.WeakKeyDictionary())
+        try:
+            return entry[1][cls]
+        except KeyError:
+            result = entry[1][cls] = _is_implementation(subclass, cls) or \
+                abc.ABCMeta.__subclasscheck__(cls, subclass)
+            return result
+
+    def register(cls, subclass):
+        """Registers `subclass` as a virtual subclass, see `abc.ABCMeta`.
+        It isn't verified: use `implements` for that.
+        """
+        global _generation
+        subclass = super().register(subclass)
+        _generation = next(_generations)    # drops the cached answers
+        return subclass
+
+
+# type -> (registry generation, {interface: bool}), weak on both types, as
+# long-lived types such as `int` would otherwise keep every interface alive
+_conformance = weakref.WeakKeyDictionary()
+_generation = 0
+# `next` on a count is atomic, so registrations never wait on each other to
+# draw a generation
+_generations = itertools.count(1)
+
+
+def _is_implementation(cls, interface_cls):
+    return type.__subclasscheck__(interface_cls, cls) or \
+        _is_registered(cls, interface_cls)
 
 
-class Interface:
+def _is_registered(cls, interface_cls):
+    for klass in cls.__mro__:
+        for registered in _interfaces.get(klass, ()):
+            if type.__subclasscheck__(interface_cls, registered):
+                return True
+    return False
+
+
+class Interface(metaclass=InterfaceMeta):
     pass
 
 
-def implements(interface_cls):
-    """Verifies whether the decorated class implements the interface as
-    defined by the `interface_cls`.
+def implements(*interfaces, lazy=False):
+    """Verifies whether the decorated class implements the interfaces as
+    defined by each class in `interfaces`.
+
+    The implementation is scanned once, whatever the number of interfaces,
+    and the errors from all of them are reported together. With `lazy`,
+    verification is deferred until the class is first instantiated. In
+    background mode (see `configure`) it is handed to a worker thread.
     """
+    if not interfaces:
+        raise TypeError('implements() requires at least one interface')
+    mode = _config['mode']
+    if mode == 'off' and not _collectors:
+        return _identity
+
     def _decorator(cls):
-        verify_class_hierarchy(interface_cls, cls)
-        errors = []
-        errors.extend(verify_methods(interface_cls, cls))
-        errors.extend(verify_properties(interface_cls, cls))
-        errors.extend(verify_attributes(interface_cls, cls))
-        if errors:
-            raise NotImplementedError(
-                'Found {} errors in implementation:\n- {}\nwith {}'.format(
-                    len(errors), '\n- '.join(errors), cls))
+        if _collectors:
+            _collectors[-1].append((interfaces, cls))
+        elif lazy:
+            defer_to_instantiation(cls, interfaces, mode)
+        elif _config['background']:
+            submit(interfaces, cls, mode)
+        else:
+            check(interfaces, cls, mode)
         return cls
 
     return _decorator
 
 
+def _identity(cls):
+    return cls
+
+
+def check(interfaces, cls, mode='strict', members=None):
+    """Verifies `cls` against `interfaces` and raises or logs the errors
+    according to `mode`.
+    """
+    try:
+        errors = verify_implementation(interfaces, cls, members)
+    except ValueError as exc:
+        if mode != 'warn':
+            raise
+        errors = [exc.args[0]]
+    if errors:
+        error = ImplementationError(errors, cls)
+        if mode == 'warn':
+            logger.warning('%s', error)
+        else:
+            raise error
+    elif _config['enforce']:
+        enforce(interfaces, cls, _config['enforce'], mode)
+
+
+def defer_to_instantiation(cls, interfaces, mode='strict'):
+    """Wraps `cls.__init__`, or `cls.__new__` if `cls` defines one, with a
+    hook which verifies `cls` the first time it, or one of its subclasses, is
+    instantiated, and then removes itself so that later instantiations cost
+    nothing. Concurrent instantiations wait for the verification, and the
+    hook stays in place if it raises.
+    """
+    # `object.__new__` can't be restored once overridden, unlike `__init__`
+    name = '__new__' if '__new__' in cls.__dict__ else '__init__'
+    original = cls.__dict__.get(name)
+    lock = threading.Lock()
+
+    def verify():
+        with lock:
+            if cls.__dict__.get(name) is not hook:
+                return
+            # verify the class as it is without the hook
+            members = get_members(cls)
+            members[name] = original if original is not None else next(
+                c.__dict__[name] for c in cls.__mro__[1:]
+                if name in c.__dict__)
+            check(interfaces, cls, mode, members)
+            if original is None:
+                delattr(cls, name)
+            else:
+                setattr(cls, name, original)
+
+    if name == '__new__':
+        @functools.wraps(original.__get__(None, cls))
+        def __new__(*args, **kwargs):
+            verify()
+            return original.__get__(None, cls)(*args, **kwargs)
+
+        hook = staticmethod(__new__)
+    else:
+        @functools.wraps(cls.__init__)
+        def hook(self, *args, **kwargs):
+            verify()
+            if original is not None:
+                return original(self, *args, **kwargs)
+            return super(cls, self).__init__(*args, **kwargs)
+
+    setattr(cls, name, hook)
+
+
+_queue = queue.Queue()
+_failures = []
+_worker_lock = threading.Lock()
+_worker = None
+
+
+def submit(interfaces, cls, mode='strict'):
+    """Queues the verification of `cls` for the background worker, which is
+    started on first use.
+    """
+    global _worker
+    if _worker is None:
+        with _worker_lock:
+            if _worker is None:
+                _worker = threading.Thread(
+                    target=_work, name='implements', daemon=True)
+                _worker.start()
+    _queue.put((interfaces, cls, mode))
+
+
+def _work():
+    while True:
+        interfaces, cls, mode = _queue.get()
+        try:
+            check(interfaces, cls, mode)
+        except Exception as exc:  # skipcq: PYL-W0703
+            _failures.append(exc)
+        finally:
+            _queue.task_done()
+
+
+def _reset_worker():
+    global _worker, _queue
+    _worker = None
+    _queue = queue.Queue()
+
+
+if hasattr(os, 'register_at_fork'):
+    # the worker thread does not survive a fork
+    os.register_at_fork(after_in_child=_reset_worker)
+
+
+def wait():
+    """Blocks until every verification queued in background mode has run.
+    Raises a single `VerificationFailures` holding all the failures collected
+    since the previous call.
+    """
+    _queue.join()
+    failures = _failures[:]
+    del _failures[:len(failures)]
+    if failures:
+        raise VerificationFailures(failures)
+
+
+_collectors = []
+
+
+@contextlib.contextmanager
+def collecting():
+    """Within the block, `implements` records the decorated classes in the
+    yielded list as `(interfaces, cls)` tuples instead of verifying them.
+    """
+    jobs = []
+    _collectors.append(jobs)
+    try:
+        yield jobs
+    finally:
+        _collectors.remove(jobs)
+
+
+def format_errors(errors, cls):
+    return 'Found {} errors in implementation:\n- {}\nwith {}'.format(
+        len(errors), '\n- '.join(str(error) for error in errors), cls)
+
+
+VIOLATIONS = {
+    'method_kind': "'{cls}' must implement '{member}' as {expected} as "
+                   "defined in interface '{interface}'",
+    'method': "'{cls}' must implement method '{member}{expected}' defined in "
+              "interface '{interface}'",
+    'accessor': "'{cls}' must implement a {expected} for property '{member}' "
+                "defined in interface '{interface}'",
+    'accessor_signature': "'{cls}' must implement a {expected} for property "
+                          "'{member}' with the same signature as defined in "
+                          "interface '{interface}'",
+    'attribute': "'{cls}' must have class attribute '{member}' defined in "
+                 "interface '{interface}'",
+    'slots': "'{cls}' must not have a per-instance __dict__ as required by "
+             "the __slots__ of interface '{interface}'. Classes adding one: "
+             "[{actual}]",
+    'hierarchy': "Found {count} common classes between the implementation "
+                 "and the interface. Expected none. The implementation class "
+                 "and any class in its class-hierarchy, must not inherit from "
+                 "the interface class, or any class from the interface "
+                 "hierarchy. Common classes: [{actual}]",
+    'interface': "Interface '{interface}' of '{cls}' could not be found in "
+                 "the checked sources",
+    'import': '{actual}',
+}
+
+
+class Violation(namedtuple('Violation',
+                           'kind member expected actual cls interface')):
+    """A way in which an implementation doesn't match an interface.
+
+    `kind` is one of `VIOLATIONS`, `member` the name of the member concerned,
+    `expected` what the interface defines and `actual` what the
+    implementation has, or None. `cls` and `interface` are the names of the
+    implementation and of the interface. The message is only rendered when
+    the violation is converted to a string.
+    """
+    __slots__ = ()
+
+    def __str__(self):
+        values = self._asdict()
+        if self.kind in ('hierarchy', 'slots'):
+            values['count'] = len(self.actual)
+            values['actual'] = ', '.join(self.actual)
+        return VIOLATIONS[self.kind].format(**values)
+
+    def portable(self):
+        """Returns a copy which can be pickled and serialized to JSON, with
+        `expected` and `actual` converted to strings unless they are None,
+        strings or tuples of strings.
+        """
+        return self._replace(expected=_plain(self.expected),
+                             actual=_plain(self.actual))
+
+    def as_dict(self):
+        """Returns the `portable` fields and the message as a dict."""
+        values = dict(self.portable()._asdict())
+        values['message'] = str(self)
+        return values
+
+
+def _plain(value):
+    if value is None or type(value) is str:
+        return value
+    if type(value) is tuple and all(type(v) is str for v in value):
+        return value
+    return str(value)
+
+
+class ImplementationError(NotImplementedError):
+    """Raised when a class doesn't implement its interfaces. `errors` holds
+    the `Violation` records and `cls` the class. The message is rendered
+    when the exception is displayed.
+    """
+
+    def __init__(self, errors, cls):
+        super().__init__(errors, cls)
+        self.errors = tuple(errors)
+        self.cls = cls
+
+    def __str__(self):
+        return format_errors(self.errors, self.cls)
+
+
+class VerificationFailures(NotImplementedError):
+    """Raised for several implementations at once. `failures` holds their
+    exceptions, usually `ImplementationError`. The message is rendered when
+    the exception is displayed.
+    """
+
+    def __init__(self, failures):
+        super().__init__(failures)
+        self.failures = tuple(failures)
+
+    def __str__(self):
+        return '{} implementations failed verification:\n\n{}'.format(
+            len(self.failures), '\n\n'.join(str(f) for f in self.failures))
+
+
+def verify_implementation(interfaces, cls, members=None):
+    """Verifies `cls` against every class in `interfaces` and returns the
+    list of errors found, as `Violation` records. Raises `ValueError` if
+    `cls` shares its class hierarchy with any of the interfaces.
+
+    If a cache directory is configured, implementations which were verified
+    successfully before, by any process, are not verified again. Valid
+    implementations are added to the registry, see `get_implementations`.
+    The time spent is recorded, see `stats`, and events are emitted, see
+    `add_hook`.
+    """
+    _emit('start', interfaces, cls)
+    start = time.perf_counter()
+    timings = dict.fromkeys(PHASES, 0.0)
+    cached = None
+    failed = True
+    errors = []
+    try:
+        if members is None:
+            members = get_members(cls)
+        key, cached = _cache_lookup(interfaces, cls, members)
+        if cached:
+            register(interfaces, cls)
+            failed = False
+            return []
+        _verify_phases(interfaces, cls, members, timings, errors)
+        if not errors:
+            register(interfaces, cls)
+            failed = False
+            if key:
+                _cache_add(key)
+        return errors
+    finally:
+        _finish(interfaces, cls, start, timings, cached, failed, errors)
+
+
+def _verify_phases(interfaces, cls, members, timings, errors):
+    """Runs each verification phase, timed into `timings`, appending the
+    errors found to `errors`.
+    """
+    try:
+        for interface_cls in interfaces:
+            _timed(timings, 'verify_class_hierarchy',
+                   verify_class_hierarchy, interface_cls, cls)
+    except ValueError as exc:
+        errors.append(exc.args[0])
+        raise
+    for interface_cls in interfaces:
+        for phase, verify in (('verify_methods', verify_methods),
+                              ('verify_properties', verify_properties),
+                              ('verify_attributes', verify_attributes)):
+            errors.extend(_timed(
+                timings, phase, verify, interface_cls, cls, members))
+
+
+def _cache_lookup(interfaces, cls, members):
+    """Returns the cache key of the implementation, if a cache directory is
+    configured, and whether it was verified successfully before.
+    """
+    if not _config['cache_dir']:
+        return None, None
+    key = fingerprint(interfaces, cls, members)
+    return key, bool(key and _cache_contains(key))
+
+
+def _finish(interfaces, cls, start, timings, cached, failed, errors):
+    duration = time.perf_counter() - start
+    _record(cls, duration, timings, cached, failed)
+    _emit('end', interfaces, cls, duration, errors)
+    if failed:
+        _emit('failure', interfaces, cls, duration, errors)
+
+
+# -- event hooks
+
+EVENTS = ('start', 'end', 'failure')
+
+VerificationEvent = namedtuple(
+    'VerificationEvent', 'event interfaces cls duration errors')
+VerificationEvent.__doc__ = """An event of `EVENTS` emitted while verifying
+`cls` against `interfaces`. `duration` and `errors` are None for 'start'."""
+
+_hooks = {event: [] for event in EVENTS}
+_audit = getattr(sys, 'audit', None)  # Python >= 3.8
+
+
+def add_hook(event, callback):
+    """Calls `callback` with a `VerificationEvent` whenever `event`, one of
+    `EVENTS`, occurs. 'start' and 'end' surround every verification, and
+    'failure' follows 'end' when the implementation is invalid.
+
+    The same events are raised as ``implements.start``, ``implements.end``
+    and ``implements.failure`` audit events, with the interfaces, the class,
+    the duration and the errors as arguments.
+    """
+    if event not in EVENTS:
+        raise ValueError(
+            "Unknown event '{}'. Expected one of: {}"
+            "".format(event, ", ".join(EVENTS)))
+    _hooks[event].append(callback)
+
+
+def remove_hook(event, callback):
+    """Stops calling `callback` for `event`, see `add_hook`."""
+    _hooks[event].remove(callback)
+
+
+def _emit(event, interfaces, cls, duration=None, errors=None):
+    if _audit is not None:
+        _audit('implements.' + event, interfaces, cls, duration, errors)
+    callbacks = _hooks[event]
+    if not callbacks:
+        return
+    record = VerificationEvent(event, interfaces, cls, duration,
+                               None if errors is None else tuple(errors))
+    for callback in tuple(callbacks):
+        try:
+            callback(record)
+        except Exception:  # skipcq: PYL-W0703
+            logger.exception('Error in %s hook %r', event, callback)
+
+
+# -- statistics
+
+PHASES = ('verify_class_hierarchy', 'verify_methods', 'verify_properties',
+          'verify_attributes')
+
+_COUNTS = ('verifications', 'failures', 'cache_hits', 'cache_misses',
+           'total')
+
+
+def _new_stats():
+    return {
+        'verifications': 0,
+        'failures': 0,
+        'cache_hits': 0,
+        'cache_misses': 0,
+        'total': 0.0,
+        'phases': dict.fromkeys(PHASES, 0.0),
+        'classes': {},
+    }
+
+
+# Each thread only updates its own statistics, so that threads verifying in
+# parallel don't contend; `stats` merges them. The lock guards the list of
+# all of them and the budget warning.
+_stats_lock = threading.Lock()
+_all_stats = []
+_local = threading.local()
+_warned_budget = None
+
+
+def _thread_stats():
+    try:
+        return _local.stats
+    except AttributeError:
+        own = _local.stats = _new_stats()
+        with _stats_lock:
+            _all_stats.append(own)
+        return own
+
+
+def _timed(timings, phase, func, *args):
+    start = time.perf_counter()
+    try:
+        return func(*args)
+    finally:
+        timings[phase] += time.perf_counter() - start
+
+
+def _record(cls, duration, timings, cached, failed):
+    global _warned_budget
+    name = _dotted_name(cls)
+    own = _thread_stats()
+    own['verifications'] += 1
+    own['failures'] += failed
+    if cached is not None:
+        own['cache_hits' if cached else 'cache_misses'] += 1
+    own['total'] += duration
+    phases = own['phases']
+    per_class = own['classes'].get(name)
+    if per_class is None:
+        per_class = own['classes'][name] = dict.fromkeys(
+            ('total',) + PHASES, 0.0)
+    per_class['total'] += duration
+    for phase, seconds in timings.items():
+        phases[phase] += seconds
+        per_class[phase] += seconds
+
+    budget = _config['budget']
+    if not budget or _warned_budget == budget or \
+            sum(s['total'] for s in tuple(_all_stats)) <= budget:
+        return
+    with _stats_lock:
+        if _warned_budget == budget:
+            return
+        _warned_budget = budget
+    merged = stats(5)
+    total, slowest = merged['total'], merged['slowest']
+    logger.warning(
+        'implements spent %.3fs verifying classes, over the budget of %.3fs. '
+        'Slowest: %s', total, budget,
+        ', '.join('{} ({:.3f}s)'.format(*item) for item in slowest))
+
+
+def _slowest(classes, count):
+    return sorted(((name, timings['total']) for name, timings in
+                   classes.items()), key=lambda item: -item[1])[:count]
+
+
+def stats(count=10):
+    """Returns statistics about the verifications run so far in this
+    process, as a dict with the keys:
+
+    - ``verifications``, ``failures``: the number of verifications run and
+      the number of those which failed;
+    - ``cache_hits``, ``cache_misses``: lookups in the on-disk cache;
+    - ``total``: the seconds spent verifying;
+    - ``phases``: the seconds spent in each of `PHASES`;
+    - ``classes``: the seconds spent in total and in each phase, by dotted
+      class name;
+    - ``slowest``: the `count` slowest classes as (name, seconds) tuples.
+    """
+    with _stats_lock:
+        all_stats = tuple(_all_stats)
+    result = _new_stats()
+    classes = result['classes']
+    for thread_stats in all_stats:
+        for key in _COUNTS:
+            result[key] += thread_stats[key]
+        for phase, seconds in dict(thread_stats['phases']).items():
+            result['phases'][phase] += seconds
+        for name, timings in dict(thread_stats['classes']).items():
+            merged = classes.get(name)
+            if merged is None:
+                merged = classes[name] = dict.fromkeys(
+                    ('total',) + PHASES, 0.0)
+            for key, seconds in dict(timings).items():
+                merged[key] += seconds
+    result['slowest'] = _slowest(classes, count)
+    return result
+
+
+def reset_stats():
+    """Discards the statistics collected so far, see `stats`."""
+    global _warned_budget
+    with _stats_lock:
+        for thread_stats in _all_stats:
+            thread_stats.update(_new_stats())
+        _warned_budget = None
+
+
+_implementations = weakref.WeakKeyDictionary()
+_interfaces = weakref.WeakKeyDictionary()
+
+
+# Registry updates lock one of `_STRIPES` locks, chosen by the class or
+# interface concerned, instead of a single lock shared by every thread.
+_STRIPES = 64
+_stripes = tuple(threading.Lock() for _ in range(_STRIPES))
+
+
+def _stripe(obj):
+    return _stripes[(id(obj) >> 4) % _STRIPES]
+
+
+def register(interfaces, cls):
+    """Records that `cls` implements each class in `interfaces`. Only weak
+    references are kept to both.
+    """
+    global _generation
+    for interface_cls in interfaces:
+        with _stripe(interface_cls):
+            implementations = _implementations.get(interface_cls)
+            if implementations is None:
+                implementations = _implementations[interface_cls] = \
+                    weakref.WeakSet()
+            implementations.add(cls)
+    with _stripe(cls):
+        known = _interfaces.get(cls, ())
+        _interfaces[cls] = known + tuple(
+            i for i in interfaces if i not in known)
+    # changed last, so that answers cached from now on see this registration.
+    # Generations are unique, so a concurrent registration storing an older
+    # one still invalidates every answer cached before it.
+    _generation = next(_generations)
+
+
+def get_implementations(interface_cls):
+    """Returns the classes verified to implement `interface_cls` which are
+    still alive.
+    """
+    implementations = _implementations.get(interface_cls)
+    if implementations is None:
+        return ()
+    with _stripe(interface_cls):
+        return tuple(implementations)
+
+
+def get_interfaces(cls):
+    """Returns the interfaces `cls` was verified to implement, in the order
+    they were verified.
+    """
+    return _interfaces.get(cls, ())
+
+
+# type -> {interface: bool}, weak on both types
+_conformers = weakref.WeakKeyDictionary()
+
+
+def conforms(obj, interface_cls):
+    """Returns whether `obj`, a class or an instance, structurally
+    implements `interface_cls`, without raising. The class doesn't need to be
+    decorated with `implements`, and the answer is cached per type.
+    """
+    cls = obj if isinstance(obj, type) else type(obj)
+    results = _conformers.get(cls)
+    if results is None:
+        results = _conformers[cls] = weakref.WeakKeyDictionary()
+    try:
+        return results[interface_cls]
+    except KeyError:
+        result = results[interface_cls] = _conforms(cls, interface_cls)
+        return result
+
+
+def _conforms(cls, interface_cls):
+    if _is_registered(cls, interface_cls):
+        return True
+    try:
+        verify_class_hierarchy(interface_cls, cls)
+    except ValueError:
+        return False
+    members = get_members(cls)
+    return not (verify_methods(interface_cls, cls, members) or
+                verify_properties(interface_cls, cls, members) or
+                verify_attributes(interface_cls, cls, members))
+
+
+def accepts(**interfaces):
+    """Decorates a function to raise `TypeError` when any of the named
+    arguments does not conform to its interface, see `conforms`.
+
+    Args:
+        **interfaces: The interface each argument must implement, by
+            parameter name.
+    """
+    def decorator(func):
+        parameters = inspect.signature(func).parameters
+        checks = []
+        for name, interface_cls in interfaces.items():
+            parameter = parameters.get(name)
+            if parameter is None or parameter.kind in (
+                    parameter.VAR_POSITIONAL, parameter.VAR_KEYWORD):
+                raise TypeError('{}() has no parameter {!r}'.format(
+                    func.__qualname__, name))
+            index = None
+            if parameter.kind is not parameter.KEYWORD_ONLY:
+                index = list(parameters).index(name)
+            checks.append((name, index, interface_cls))
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            for name, index, interface_cls in checks:
+                if index is not None and index < len(args):
+                    value = args[index]
+                elif name in kwargs:
+                    value = kwargs[name]
+                else:
+                    continue
+                if not conforms(value, interface_cls):
+                    raise TypeError(
+                        '{}() argument {!r} must implement {}, not {}'.format(
+                            func.__qualname__, name, interface_cls.__name__,
+                            type(value).__name__))
+            return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _resolve(registry, cls, default):
+    """Returns the implementation in the `dispatch` `registry` for the
+    nearest class in `cls.__mro__`, or `default`.
+    """
+    for klass in cls.__mro__:
+        if klass in registry:
+            return registry[klass]
+        interfaces = _interfaces.get(klass, ())
+        candidates = [key for key in registry
+                      if isinstance(key, InterfaceMeta) and any(
+                          issubclass(interface_cls, key)
+                          for interface_cls in interfaces)]
+        for key in candidates:
+            if not any(other is not key and issubclass(other, key)
+                       for other in candidates):
+                return registry[key]
+    return default
+
+
+def dispatch(func):
+    """Transforms `func` into a generic function which dispatches on the
+    type of its first argument, like `functools.singledispatch`, except that
+    implementations are registered for interfaces and resolved through the
+    registry of verified implementations, see `get_interfaces`.
+
+    The implementation used is the one registered for the interfaces of the
+    nearest class in the method resolution order of the argument's type.
+    Among those, an interface is preferred over the interfaces it derives
+    from, and otherwise the first one registered wins. Plain classes can be
+    registered as well and take precedence at their place in the order.
+    Resolutions are cached per type.
+    """
+    registry = {object: func}
+    cache = weakref.WeakKeyDictionary()
+
+    def dispatch(cls):
+        entry = cache.get(cls)
+        if entry is None or entry[0] != _generation:
+            entry = cache[cls] = (_generation,
+                                  _resolve(registry, cls, func))
+        return entry[1]
+
+    def register(key, impl=None):
+        if not isinstance(key, type):
+            raise TypeError('{}.register() expects a class, got {!r}'.format(
+                func.__qualname__, key))
+        if impl is None:
+            return lambda impl: register(key, impl)
+        registry[key] = impl
+        cache.clear()
+        return impl
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not args:
+            raise TypeError('{} requires at least 1 positional argument'
+                            .format(func.__qualname__))
+        return dispatch(args[0].__class__)(*args, **kwargs)
+
+    wrapper.register = register
+    wrapper.dispatch = dispatch
+    wrapper.registry = types.MappingProxyType(registry)
+    return wrapper
+
+
 def get_mro(cls):
-    return cls.mro()[:-1] if cls.mro()[-1] is object else cls.mro()
+    mro = cls.__mro__
+    return list(mro[:-1] if mro[-1] is object else mro)
+
+
+def get_members(cls):
+    """Returns a dict of every member visible on `cls` mapped to its raw
+    object, as found in the `__dict__` of the first class in `cls.__mro__`
+    defining it. Descriptors are not invoked.
+    """
+    members = {}
+    for c in cls.__mro__:
+        for name, obj in c.__dict__.items():
+            members.setdefault(name, obj)
+    return members
+
+
+def bind(obj, cls, default=None):
+    """Returns what looking up the raw member `obj` on `cls` evaluates to,
+    i.e. what `getattr(cls, name, default)` would return for it.
+    """
+    getter = getattr(type(obj), '__get__', None)
+    if getter is None:
+        return obj
+    try:
+        return getter(obj, None, cls)
+    except AttributeError:
+        return default
 
 
 def verify_class_hierarchy(ifc, cls):
-    ifc_mro = get_mro(ifc)
-    cls_mro = get_mro(cls)
-    common = set(ifc_mro) & set(cls_mro)
+    """Raises `ValueError`, with a `Violation` as its argument, if `cls`
+    shares its class hierarchy with the interface `ifc`.
+    """
+    common = get_spec(ifc).mro.intersection(get_mro(cls))
     if len(common):
-        raise ValueError(
-            "Found {} common classes between the implementation and the "
-            "interface. Expected none. The implementation class and any "
-            "class in its class-hierarchy, must not inherit from the "
-            "interface class, or any class from the interface hierarchy. "
-            "Common classes: [{}]"
-            "".format(len(common), ", ".join([str(s) for s in common]))
-        )
+        raise ValueError(Violation(
+            'hierarchy', None, None, tuple(sorted(str(s) for s in common)),
+            cls.__name__, ifc.__name__))
 
 
 def getobj_via_dict(cls, name):
@@ -122,101 +1045,1985 @@ def verify_method_type(method_typer, expected_type,
     errors = []
     if method_typer(ifc_obj):
         if not method_typer(cls_obj):
-            errors.append(
-                "'{}' must implement '{}' as {} as defined in interface '{}'"
-                "".format(cls_name, name, expected_type, ifc_name)
-            )
+            errors.append(Violation('method_kind', name, expected_type,
+                                    cls_obj, cls_name, ifc_name))
     return errors
 
 
-def verify_methods(interface_cls, cls):
-    def methods_predicate(m):
-        return inspect.isfunction(m) or inspect.ismethod(m)
-
+def verify_methods(interface_cls, cls, members=None):
+    if members is None:
+        members = get_members(cls)
     errors = []
-    for name, method in inspect.getmembers(interface_cls, methods_predicate):
-        signature = inspect.signature(method)
-        cls_method = getattr(cls, name, None)
-        cls_signature = None
-        ifc_name = interface_cls.__name__
-        cls_name = cls.__name__
+    ifc_name = interface_cls.__name__
+    cls_name = cls.__name__
+    for method in get_spec(interface_cls).methods.values():
+        name = method.name
+        cls_obj = members.get(name)
+        cls_method = bind(cls_obj, cls)
+        matches = False
         if cls_method and callable(cls_method):
-            cls_signature = inspect.signature(cls_method)
-        ifc_obj = getobj_via_dict(interface_cls, name)
-        cls_obj = getobj_via_dict(cls, name)
-
-        method_types_to_check = [
-            (is_classmethod, "a classmethod"),
-            (is_staticmethod, "a staticmethod"),
-            (inspect.isasyncgenfunction, "an async genenerator-function"),
-            (inspect.isgeneratorfunction, "a generator-function"),
-            (inspect.iscoroutinefunction, "a coroutine-function")
-        ]
-        for (method_typer, expected_type) in method_types_to_check:
+            matches = signature_matches(method, cls_method)
+
+        for kind in method.kinds:
+            method_typer, expected_type = _METHOD_KINDS[kind]
             errors.extend(
-                verify_method_type(method_typer, expected_type,
-                                   name, ifc_obj, cls_obj, ifc_name, cls_name)
+                verify_method_type(method_typer, expected_type, name,
+                                   method.obj, cls_obj, ifc_name, cls_name)
             )
 
-        if cls_signature != signature:
-            errors.append(
-                "'{}' must implement method '{}{}' defined in interface '{}'"
-                .format(cls_name, name, signature, ifc_name)
-            )
+        if not matches:
+            errors.append(Violation('method', name, method.signature,
+                                    cls_method, cls_name, ifc_name))
     return errors
 
 
-def verify_properties(interface_cls, cls):
+def verify_properties(interface_cls, cls, members=None):
+    if members is None:
+        members = get_members(cls)
     errors = []
-    prop_attrs = dict(fget='getter', fset='setter', fdel='deleter')
-    descriptors = inspect.getmembers(interface_cls, inspect.isdatadescriptor)
-    for name, prop in descriptors:
-        cls_prop = getattr(cls, name, None)
-        for attr in prop_attrs:
+    ifc_name = interface_cls.__name__
+    cls_name = cls.__name__
+    for prop in get_spec(interface_cls).properties.values():
+        name = prop.name
+        cls_prop = bind(members.get(name), cls)
+        for accessor in prop.accessors:
             # instanceof doesn't work for class function comparison
-            ifc_prop_obj = getattr(prop, attr, None)
-            cls_prop_obj = getattr(cls_prop, attr, None)
-            if ifc_prop_obj:
-                cls_name = cls.__name__
-                ifc_name = interface_cls.__name__
-                proptype = prop_attrs[attr]
-
-                # -- verify presence and type of data-descriptors
-                if type(ifc_prop_obj) != type(cls_prop_obj):
-                    errors.append(
-                        "'{}' must implement a {} for property '{}' defined "
-                        "in interface '{}'"
-                        "".format(cls_name, proptype, name, ifc_name)
-                    )
-                    continue
+            cls_prop_obj = getattr(cls_prop, accessor.attr, None)
+            proptype = _PROPERTY_ACCESSORS[accessor.attr]
+
+            # -- verify presence and type of data-descriptors
+            if accessor.type != type(cls_prop_obj):
+                errors.append(Violation('accessor', name, proptype,
+                                        cls_prop_obj, cls_name, ifc_name))
+                continue
 
-                # -- verify signatures of data-descriptors
-                ifc_prop_sig = inspect.signature(ifc_prop_obj)
-                cls_prop_sig = None
-                if callable(cls_prop_obj):
-                    cls_prop_sig = inspect.signature(cls_prop_obj)
-                if ifc_prop_sig != cls_prop_sig:
-                    errors.append(
-                        "'{}' must implement a {} for property '{}' with the "
-                        "same signature as defined in interface '{}'"
-                        "".format(cls_name, proptype, name, ifc_name)
-                    )
+            # -- verify signatures of data-descriptors
+            if not (callable(cls_prop_obj) and
+                    signature_matches(accessor, cls_prop_obj)):
+                errors.append(Violation('accessor_signature', name, proptype,
+                                        cls_prop_obj, cls_name, ifc_name))
     return errors
 
 
-def verify_attributes(interface_cls, cls):
+def verify_attributes(interface_cls, cls, members=None):
+    """Verifies the attributes of `interface_cls` are class attributes of
+    `cls`, slots, or annotated in its class body, and that `cls` has no
+    per-instance `__dict__` if the interface declares `__slots__`.
+    """
+    if members is None:
+        members = get_members(cls)
+    spec = get_spec(interface_cls)
     errors = []
-    interface_attributes = get_attributes(interface_cls)
-    cls_attributes = get_attributes(cls)
-    for missing_attr in interface_attributes - cls_attributes:
-        errors.append(
-            "'{}' must have class attribute '{}' defined in interface '{}'"
-            .format(cls.__name__, missing_attr, interface_cls.__name__)
-        )
+    missing = [name for name in spec.attributes
+               if name not in members
+               or is_callable_member(members[name], cls)]
+    if missing:
+        annotated = get_annotated(cls)
+        missing = [name for name in missing
+                   if name in members or name not in annotated]
+    for missing_attr in missing:
+        errors.append(Violation(
+            'attribute', missing_attr, None, members.get(missing_attr),
+            cls.__name__, interface_cls.__name__))
+    if spec.slotted and cls.__dictoffset__:
+        # the classes whose instances have a __dict__ their bases don't have
+        adding = tuple(c.__name__ for c in cls.__mro__ if c.__dictoffset__
+                       and not any(b.__dictoffset__ for b in c.__bases__))
+        errors.append(Violation('slots', '__dict__', None, adding,
+                                cls.__name__, interface_cls.__name__))
     return errors
 
 
-def get_attributes(cls):
-    boring = dir(type('dummy', (object,), {}))
-    return set(item[0] for item in inspect.getmembers(cls)  # skipcq: PTC-W0015
-               if item[0] not in boring and not callable(item[1]))
+# Members describing the layout or the source of a class body, or cached by
+# `get_spec`, rather than its attributes
+_LAYOUT = frozenset((
+    '__slots__', '__annotations__', '__annotate__', '__annotate_func__',
+    '__annotations_cache__', '__static_attributes__', '__firstlineno__',
+    '__implements_spec__', '__abstractmethods__', '_abc_impl',
+    '_abc_registry', '_abc_cache', '_abc_negative_cache',
+    '_abc_negative_cache_version'))
+
+_BORING = frozenset(dir(type('dummy', (object,), {}))).union(_LAYOUT)
+
+
+def get_attributes(cls, members=None):
+    """Returns the names of the non-callable members of `cls` and of the
+    names annotated in its class hierarchy, such as ``echoes: bool``.
+    """
+    if members is None:
+        members = get_members(cls)
+    attributes = set(name for name, obj in members.items()
+                     if name not in _BORING
+                     and not is_callable_member(obj, cls))
+    attributes.update(name for name in get_annotated(cls)
+                      if name not in _BORING and name not in members)
+    return attributes
+
+
+def get_annotated(cls):
+    """Returns the names annotated in the bodies of `cls` and its bases."""
+    names = set()
+    for c in cls.__mro__:
+        if annotationlib is None:
+            names.update(c.__dict__.get('__annotations__', ()))
+        else:
+            names.update(annotationlib.get_annotations(
+                c, format=annotationlib.Format.FORWARDREF))
+    return names
+
+
+def is_callable_member(obj, cls):
+    """Returns True if the raw member `obj` is callable once looked up on
+    `cls`. Only descriptors of unknown types are invoked to find out.
+    """
+    if isinstance(obj, (types.FunctionType, classmethod)):
+        return True
+    if isinstance(obj, staticmethod):
+        return callable(obj.__func__)
+    if isinstance(obj, (property, types.MemberDescriptorType)):
+        return False
+    return callable(bind(obj, cls, default=obj))
+
+
+_EMPTY = inspect.Parameter.empty
+
+_facts = weakref.WeakKeyDictionary()
+
+
+def signature_facts(obj):
+    """Returns what the signature of `obj` is made of, read straight from the
+    code object and attributes of the function, or None unless `obj` is a
+    plain Python function or a method bound to one.
+
+    Two callables with facts have equal signatures if and only if their facts
+    are equal, which is much cheaper to find out than building and comparing
+    `inspect.Signature` objects. Facts are memoized per function.
+    """
+    bound = isinstance(obj, types.MethodType)
+    func = obj.__func__ if bound else obj
+    if type(func) is not types.FunctionType:
+        return None
+    try:
+        facts = _facts[func]
+    except KeyError:
+        facts = _facts[func] = _read_facts(func)
+    if bound and facts and facts[0] and facts[0][0][1] <= 1:
+        # like inspect.signature, drop the parameter the method is bound to
+        facts = (facts[0][1:],) + facts[1:]
+    return facts
+
+
+def _read_facts(func):
+    if hasattr(func, '__wrapped__') or hasattr(func, '__signature__'):
+        return None     # the signature is not the one of the code object
+    code = func.__code__
+    names = code.co_varnames
+    annotations = _annotations(func)
+    defaults = func.__defaults__ or ()
+    kwdefaults = func.__kwdefaults__ or {}
+    posonly = getattr(code, 'co_posonlyargcount', 0)
+    count = code.co_argcount
+    first_default = count - len(defaults)
+
+    params = []
+    for i in range(count):
+        name = names[i]
+        params.append((
+            name, 0 if i < posonly else 1,
+            defaults[i - first_default] if i >= first_default else _EMPTY,
+            annotations.get(name, _EMPTY)))
+    keyword_only = sorted(
+        (name, 3, kwdefaults.get(name, _EMPTY), annotations.get(name, _EMPTY))
+        for name in names[count:count + code.co_kwonlyargcount])
+    count += code.co_kwonlyargcount
+    if code.co_flags & inspect.CO_VARARGS:
+        params.append((names[count], 2, _EMPTY,
+                       annotations.get(names[count], _EMPTY)))
+        count += 1
+    params.extend(keyword_only)
+    if code.co_flags & inspect.CO_VARKEYWORDS:
+        params.append((names[count], 4, _EMPTY,
+                       annotations.get(names[count], _EMPTY)))
+    return (tuple(params), annotations.get('return', _EMPTY))
+
+
+def _annotations(func):
+    if annotationlib is None:
+        return func.__annotations__
+    # deferred annotations: names which are not defined yet become ForwardRef
+    return annotationlib.get_annotations(
+        func, format=annotationlib.Format.FORWARDREF)
+
+
+def signature_matches(spec, obj):
+    """Returns whether the callable `obj` has the signature of `spec`, a
+    `MethodSpec` or `AccessorSpec`. Only builds an `inspect.Signature` for
+    `obj` when the signature facts of either side are not available.
+
+    Signatures which differ are compared again with their annotations
+    normalized, unless annotations are compared 'exact'ly (see
+    `configure`).
+    """
+    facts = signature_facts(obj) if spec.facts is not None else None
+    if facts is not None:
+        if facts == spec.facts:
+            return True
+    elif inspect.signature(obj) == spec.signature:
+        return True
+    mode = _config['annotations']
+    return mode != 'exact' and \
+        _normalized_facts(spec.obj, mode, spec) == \
+        _normalized_facts(obj, mode)
+
+
+# function -> {(mode, of a spec, bound): facts}
+_normalized = weakref.WeakKeyDictionary()
+
+
+def _normalized_facts(obj, mode, spec=None):
+    """Returns the signature facts of `obj`, or of `spec` if given, with
+    their annotations normalized according to `mode`. Memoized per function.
+    """
+    func = getattr(obj, '__func__', obj)
+    key = (mode, spec is not None, isinstance(obj, types.MethodType))
+    try:
+        cache = _normalized.setdefault(func, {})
+    except TypeError:   # not weakly referenceable
+        cache = {}
+    try:
+        return cache[key]
+    except KeyError:
+        pass
+    if spec is not None:
+        facts = spec.facts or _facts_from_signature(spec.signature)
+    else:
+        facts = signature_facts(obj) or \
+            _facts_from_signature(inspect.signature(obj))
+    globalns = getattr(inspect.unwrap(func), '__globals__', {})
+    params, returns = facts
+    normalized = cache[key] = (
+        tuple((name, kind, default,
+               normalize_annotation(annotation, mode, globalns))
+              for name, kind, default, annotation in params),
+        normalize_annotation(returns, mode, globalns))
+    return normalized
+
+
+def _facts_from_signature(signature):
+    params, keyword_only, var_keyword = [], [], []
+    for param in signature.parameters.values():
+        fact = (param.name, int(param.kind),
+                _EMPTY if param.default is param.empty else param.default,
+                _EMPTY if param.annotation is param.empty
+                else param.annotation)
+        if param.kind is param.KEYWORD_ONLY:
+            keyword_only.append(fact)
+        elif param.kind is param.VAR_KEYWORD:
+            var_keyword.append(fact)
+        else:
+            params.append(fact)
+    keyword_only.sort(key=lambda fact: fact[0])
+    returns = signature.return_annotation
+    return (tuple(params + keyword_only + var_keyword),
+            _EMPTY if returns is signature.empty else returns)
+
+
+_ForwardRef = getattr(typing, 'ForwardRef', None) or \
+    getattr(typing, '_ForwardRef', None)  # Python < 3.7
+_UnionType = getattr(types, 'UnionType', ())  # Python >= 3.10
+_QUALIFIED = re.compile(r'(?<![\w.])[^\W\d][\w<>]*\.(?:[\w<>]+\.)*(\w+)')
+_STRING_LITERAL = re.compile(r'''('(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")''')
+_BUILTIN_ALIASES = re.compile(r'\b(List|Dict|Set|FrozenSet|Tuple|Type)\b')
+
+
+def normalize_annotation(annotation, mode, globalns=None):
+    """Returns a form of `annotation` which compares equal for equivalent
+    annotations, according to `mode`, see `ANNOTATIONS`.
+    """
+    if annotation is _EMPTY or mode == 'exact':
+        return annotation
+    if mode == 'string':
+        return _annotation_string(annotation)
+    if isinstance(annotation, str):
+        try:
+            annotation = eval(annotation, globalns or {})  # skipcq: PYL-W0123
+        except Exception:  # skipcq: PYL-W0703
+            return _annotation_string(annotation)
+    return _canonical_hint(annotation, globalns)
+
+
+def _annotation_string(annotation):
+    if isinstance(annotation, str):
+        text = annotation
+    elif annotation is None:
+        text = 'None'
+    elif _ForwardRef is not None and isinstance(annotation, _ForwardRef):
+        text = annotation.__forward_arg__
+    elif isinstance(annotation, type) and \
+            getattr(annotation, '__origin__', None) is None:
+        text = annotation.__qualname__
+    else:
+        text = repr(annotation)
+    # strings are forward references, unless they are `Literal` values
+    parts = _STRING_LITERAL.split(text)
+    literals = []
+    for i, part in enumerate(parts):
+        if i % 2 == 0:
+            parts[i] = _unqualified(part)
+            _literal_depths(parts[i], literals)
+        elif literals and literals[-1]:
+            parts[i] = _literal_string(part)
+        else:
+            parts[i] = _annotation_string(_literal_string(part)[1:-1])
+    return ''.join(parts)
+
+
+def _unqualified(text):
+    text = re.sub(r'\s', '', text).replace('NoneType', 'None')
+    text = _QUALIFIED.sub(r'\1', text)
+    return _BUILTIN_ALIASES.sub(lambda match: match.group(1).lower(), text)
+
+
+def _literal_depths(text, literals):
+    """Pushes to `literals`, for each subscript opened in `text`, whether it
+    is a `Literal`, and pops it when it's closed.
+    """
+    for i, char in enumerate(text):
+        if char == '[':
+            literals.append(text[:i].endswith('Literal'))
+        elif char == ']' and literals:
+            literals.pop()
+
+
+def _literal_string(literal):
+    try:
+        return repr(ast.literal_eval(literal))
+    except (SyntaxError, ValueError):
+        return literal
+
+
+def _canonical_hint(hint, globalns):
+    if _ForwardRef is not None and isinstance(hint, _ForwardRef):
+        return normalize_annotation(hint.__forward_arg__, 'resolve', globalns)
+    if hint is None:
+        return type(None)
+    origin = getattr(hint, '__origin__', None)
+    if isinstance(hint, _UnionType):
+        origin = typing.Union
+    args = getattr(hint, '__args__', None)
+    if origin is None:
+        return hint
+    if not args:
+        return origin
+    args = tuple(_canonical_hint(arg, globalns) for arg in args)
+    if origin is typing.Union:
+        try:
+            return typing.Union, frozenset(args)
+        except TypeError:
+            pass
+    return origin, args
+
+
+_METHOD_KINDS = {
+    'classmethod': (is_classmethod, "a classmethod"),
+    'staticmethod': (is_staticmethod, "a staticmethod"),
+    'asyncgenfunction': (inspect.isasyncgenfunction,
+                         "an async genenerator-function"),
+    'generatorfunction': (inspect.isgeneratorfunction, "a generator-function"),
+    'coroutinefunction': (inspect.iscoroutinefunction, "a coroutine-function"),
+}
+
+# Modules whose base classes declare empty `__slots__` only so as not to
+# impose a `__dict__` on their subclasses
+_SLOTS_NEUTRAL = frozenset((
+    'abc', 'typing', 'typing_extensions', '_collections_abc',
+    'collections.abc'))
+
+_PROPERTY_ACCESSORS = dict(fget='getter', fset='setter', fdel='deleter')
+
+
+InterfaceSpec = namedtuple(
+    'InterfaceSpec', 'interface mro methods properties attributes slotted')
+InterfaceSpec.__doc__ = """Precompiled, read-only description of an interface.
+
+Attributes:
+    interface (type): The interface class the spec was compiled from
+    mro (frozenset): Classes of the interface hierarchy, excluding `object`
+    methods (mapping): Method name to `MethodSpec`
+    properties (mapping): Property name to `PropertySpec`
+    attributes (frozenset): Names of the class attributes, slots and
+        annotated attributes
+    slotted (bool): Whether a class of the interface hierarchy declares
+        `__slots__`, so that implementations must not have a `__dict__`
+"""
+
+MethodSpec = namedtuple('MethodSpec', 'name obj signature facts kinds')
+MethodSpec.__doc__ = """A method of an interface, its signature and its
+`signature_facts`, and the names of the method kinds (see `_METHOD_KINDS`)
+the implementation must match."""
+
+PropertySpec = namedtuple('PropertySpec', 'name accessors')
+PropertySpec.__doc__ = """A data-descriptor of an interface and the accessors
+(`AccessorSpec`) it defines."""
+
+AccessorSpec = namedtuple('AccessorSpec', 'attr type signature facts obj')
+AccessorSpec.__doc__ = """The getter, setter or deleter of a property."""
+
+
+_specs = weakref.WeakKeyDictionary()
+
+
+def get_spec(interface_cls):
+    """Returns the `InterfaceSpec` of `interface_cls`.
+
+    The interface is introspected the first time it is seen, after which the
+    compiled spec is reused by every verification against it. Interfaces are
+    expected not to change once they have been used.
+    """
+    spec = interface_cls.__dict__.get('__implements_spec__')
+    if spec is None:
+        spec = _specs.get(interface_cls)
+    if spec is None:
+        spec = compile_spec(interface_cls)
+        try:
+            # kept by the interface itself, since the spec refers to it: a
+            # cache outside of it would keep it alive
+            type.__setattr__(interface_cls, '__implements_spec__', spec)
+        except TypeError:   # builtin and extension types
+            _specs[interface_cls] = spec
+    return spec
+
+
+def compile_spec(interface_cls):
+    """Introspects `interface_cls` and returns a new `InterfaceSpec`."""
+    def methods_predicate(m):
+        return inspect.isfunction(m) or inspect.ismethod(m)
+
+    methods = {}
+    for name, method in inspect.getmembers(interface_cls, methods_predicate):
+        if name in _LAYOUT:
+            continue
+        obj = getobj_via_dict(interface_cls, name)
+        kinds = tuple(kind for kind, (method_typer, _) in _METHOD_KINDS.items()
+                      if method_typer(obj))
+        methods[name] = MethodSpec(name, obj, inspect.signature(method),
+                                   signature_facts(method), kinds)
+
+    properties = {}
+    descriptors = inspect.getmembers(interface_cls, inspect.isdatadescriptor)
+    for name, prop in descriptors:
+        accessors = []
+        for attr in _PROPERTY_ACCESSORS:
+            ifc_prop_obj = getattr(prop, attr, None)
+            if ifc_prop_obj:
+                accessors.append(AccessorSpec(
+                    attr, type(ifc_prop_obj), inspect.signature(ifc_prop_obj),
+                    signature_facts(ifc_prop_obj), ifc_prop_obj))
+        if accessors:
+            properties[name] = PropertySpec(name, tuple(accessors))
+
+    return InterfaceSpec(
+        interface=interface_cls,
+        mro=frozenset(get_mro(interface_cls)),
+        methods=types.MappingProxyType(methods),
+        properties=types.MappingProxyType(properties),
+        attributes=frozenset(get_attributes(interface_cls)),
+        slotted=any('__slots__' in c.__dict__ and
+                    c.__module__ not in _SLOTS_NEUTRAL
+                    for c in get_mro(interface_cls)),
+    )
+
+
+# -- runtime enforcement
+
+
+def enforce(interfaces, cls, rate=1, mode='strict'):
+    """Replaces the methods of `cls` defined by `interfaces` with wrappers
+    which check, once every `rate` calls, the arguments and return value
+    against the annotations of the interface. Violations raise `TypeError`,
+    or are logged in 'warn' mode.
+
+    Only annotations which translate to an `isinstance` check are enforced,
+    such as classes, unions and the origin of generics like ``List[int]``.
+    The arguments of generators are checked when they start, and their
+    return value is not checked.
+    """
+    members = get_members(cls)
+    for interface_cls in interfaces:
+        for name, method in get_spec(interface_cls).methods.items():
+            obj = members.get(name)
+            func = getattr(obj, '__func__', obj)
+            if not inspect.isfunction(func) or func in _enforced:
+                continue
+            params, returns = _compile_checks(
+                getattr(method.obj, '__func__', method.obj))
+            if not params and returns is None:
+                continue
+            wrapper = _enforcing(func, params, returns, rate, mode)
+            _enforced.add(wrapper)
+            if isinstance(obj, (classmethod, staticmethod)):
+                wrapper = type(obj)(wrapper)
+            setattr(cls, name, wrapper)
+
+
+_enforced = weakref.WeakSet()
+_checks = weakref.WeakKeyDictionary()
+
+
+def _compile_checks(func):
+    """Returns the `isinstance` checks for the annotations of `func`, as a
+    tuple of (name, position, type) for its parameters, and the type of its
+    return value or None. Compiled once per function.
+    """
+    try:
+        return _checks[func]
+    except KeyError:
+        pass
+    try:
+        hints = typing.get_type_hints(func)
+    except Exception:  # skipcq: PYL-W0703
+        hints = {name: type(None) if hint is None else hint
+                 for name, hint in func.__annotations__.items()
+                 if not isinstance(hint, str)}
+    params = []
+    parameters = inspect.signature(func, follow_wrapped=False).parameters
+    for position, param in enumerate(parameters.values()):
+        expected = _runtime_type(hints.get(param.name))
+        if expected is None or param.kind in (param.VAR_POSITIONAL,
+                                              param.VAR_KEYWORD):
+            continue
+        if param.kind is param.KEYWORD_ONLY:
+            position = None
+        params.append((param.name, position, expected))
+    returns = _runtime_type(hints.get('return'))
+    checks = _checks[func] = (tuple(params), returns)
+    return checks
+
+
+def _runtime_type(hint):
+    """Returns the class, or tuple of classes, an `isinstance` check for
+    `hint` can use, or None if it can't be checked.
+    """
+    if hint is None or hint is typing.Any or hint is object:
+        return None
+    origin = getattr(hint, '__origin__', None)
+    union = getattr(types, 'UnionType', ())
+    if origin is typing.Union or isinstance(hint, union):
+        expected = tuple(_runtime_type(arg) for arg in hint.__args__)
+        if None in expected:
+            return None
+        return tuple(itertools.chain.from_iterable(
+            e if isinstance(e, tuple) else (e,) for e in expected))
+    if origin is not None:
+        hint = origin
+    if not isinstance(hint, type):
+        return None
+    try:
+        isinstance(None, hint)
+    except TypeError:
+        return None
+    return hint
+
+
+class _Enforcer:
+    """The checks of an enforced function, run on one call in `rate`."""
+
+    def __init__(self, func, params, returns, rate, mode):
+        self.calls = itertools.count()
+        self.qualname = func.__qualname__
+        self.params = params
+        self.returns = returns
+        self.rate = rate
+        self.mode = mode
+
+    def due(self):
+        return not next(self.calls) % self.rate
+
+    def violation(self, message):
+        if self.mode == 'warn':
+            logger.warning(message)
+        else:
+            raise TypeError(message)
+
+    def check_arguments(self, args, kwargs):
+        for name, position, expected in self.params:
+            if position is not None and position < len(args):
+                value = args[position]
+            elif name in kwargs:
+                value = kwargs[name]
+            else:
+                continue
+            if not isinstance(value, expected):
+                self.violation('{}() argument {!r} must be {}, not {}'.format(
+                    self.qualname, name, _type_names(expected),
+                    type(value).__name__))
+
+    def check_return(self, value):
+        if self.returns is not None and not isinstance(value, self.returns):
+            self.violation('{}() must return {}, not {}'.format(
+                self.qualname, _type_names(self.returns),
+                type(value).__name__))
+
+
+def _enforcing(func, params, returns, rate, mode):
+    enforcer = _Enforcer(func, params, returns, rate, mode)
+    for is_kind, wrap in _WRAPPERS:
+        if is_kind(func):
+            return functools.wraps(func)(wrap(func, enforcer))
+    return functools.wraps(func)(_wrap_function(func, enforcer))
+
+
+def _wrap_function(func, enforcer):
+    def wrapper(*args, **kwargs):
+        if not enforcer.due():
+            return func(*args, **kwargs)
+        enforcer.check_arguments(args, kwargs)
+        result = func(*args, **kwargs)
+        enforcer.check_return(result)
+        return result
+    return wrapper
+
+
+def _wrap_coroutine_function(func, enforcer):
+    async def wrapper(*args, **kwargs):
+        if not enforcer.due():
+            return await func(*args, **kwargs)
+        enforcer.check_arguments(args, kwargs)
+        result = await func(*args, **kwargs)
+        enforcer.check_return(result)
+        return result
+    return wrapper
+
+
+def _wrap_generator_function(func, enforcer):
+    def wrapper(*args, **kwargs):
+        if enforcer.due():
+            enforcer.check_arguments(args, kwargs)
+        return (yield from func(*args, **kwargs))
+    return wrapper
+
+
+def _wrap_asyncgen_function(func, enforcer):
+    async def wrapper(*args, **kwargs):
+        if enforcer.due():
+            enforcer.check_arguments(args, kwargs)
+        async for item in func(*args, **kwargs):
+            yield item
+    return wrapper
+
+
+# checked in order: async generator functions are not coroutine functions
+_WRAPPERS = (
+    (inspect.isasyncgenfunction, _wrap_asyncgen_function),
+    (inspect.iscoroutinefunction, _wrap_coroutine_function),
+    (inspect.isgeneratorfunction, _wrap_generator_function),
+)
+
+
+def _type_names(expected):
+    if isinstance(expected, tuple):
+        return ' or '.join(cls.__name__ for cls in expected)
+    return expected.__name__
+
+
+# -- on-disk verification cache
+
+_CACHE_VERSION = '2'
+
+_MISSING = object()
+
+_spec_fingerprints = weakref.WeakKeyDictionary()
+
+
+def fingerprint(interfaces, cls, members=None):
+    """Returns a hex digest of everything the verification of `cls` against
+    `interfaces` depends on: the interface specs, the class hierarchy of
+    `cls` and the signatures and kinds of the members the interfaces ask for.
+    Returns None if one of those members can't be fingerprinted reliably.
+    """
+    if members is None:
+        members = get_members(cls)
+    parts = [_CACHE_VERSION, str(sys.implementation.cache_tag),
+             _config['annotations'], str(cls.__dictoffset__)]
+    parts.extend(_dotted_name(c) for c in cls.__mro__)
+    annotated = None
+    for interface_cls in interfaces:
+        spec = get_spec(interface_cls)
+        parts.append(_spec_fingerprint(spec))
+        if spec.attributes:
+            if annotated is None:
+                annotated = get_annotated(cls)
+            parts.append(','.join(sorted(spec.attributes & annotated)))
+        names = set(spec.methods).union(spec.properties, spec.attributes)
+        for name in sorted(names):
+            part = _member_fingerprint(members.get(name, _MISSING))
+            if part is None:
+                return None
+            parts.append('{}={}'.format(name, part))
+    return _digest('\0'.join(parts))
+
+
+def _digest(text):
+    import hashlib
+    return hashlib.sha1(text.encode()).hexdigest()
+
+
+def _spec_fingerprint(spec):
+    try:
+        return _spec_fingerprints[spec.interface]
+    except KeyError:
+        pass
+    parts = sorted(_dotted_name(c) for c in spec.mro)
+    for method in spec.methods.values():
+        parts.append('{}{}{}'.format(
+            method.name, method.signature, method.kinds))
+    for prop in spec.properties.values():
+        parts.append('{}{}'.format(prop.name, [
+            (a.attr, a.type.__qualname__, str(a.signature))
+            for a in prop.accessors]))
+    parts.extend(sorted(spec.attributes))
+    parts.append('slotted' if spec.slotted else '')
+    result = _spec_fingerprints[spec.interface] = '\0'.join(parts)
+    return result
+
+
+def _member_fingerprint(obj):
+    if obj is _MISSING:
+        return '-'
+    if isinstance(obj, types.FunctionType):
+        return _function_fingerprint(obj)
+    if isinstance(obj, (staticmethod, classmethod)):
+        inner = _member_fingerprint(obj.__func__)
+        return inner and '{}({})'.format(type(obj).__name__, inner)
+    if isinstance(obj, property):
+        parts = [_member_fingerprint(f) if f is not None else '-'
+                 for f in (obj.fget, obj.fset, obj.fdel)]
+        if None in parts:
+            return None
+        return 'property({})'.format(','.join(parts))
+    if isinstance(obj, (types.MemberDescriptorType,
+                        types.GetSetDescriptorType)):
+        return type(obj).__name__
+    if callable(obj) or hasattr(type(obj), '__get__'):
+        # their signatures and binding are up to arbitrary code
+        return None
+    return 'value'
+
+
+def _function_fingerprint(func):
+    code = func.__code__
+    nargs = (code.co_argcount + code.co_kwonlyargcount +
+             bool(code.co_flags & inspect.CO_VARARGS) +
+             bool(code.co_flags & inspect.CO_VARKEYWORDS))
+    parts = [code.co_argcount, getattr(code, 'co_posonlyargcount', 0),
+             code.co_kwonlyargcount, code.co_flags, code.co_varnames[:nargs],
+             func.__defaults__, func.__kwdefaults__, func.__annotations__,
+             getattr(func, '__signature__', None)]
+    wrapped = getattr(func, '__wrapped__', None)
+    if wrapped is not None:
+        inner = _member_fingerprint(wrapped)
+        if inner is None:
+            return None
+        parts.append(inner)
+    return repr(parts)
+
+
+def _cache_path(key):
+    return os.path.join(_config['cache_dir'], key[:2], key)
+
+
+def _cache_contains(key):
+    return os.path.exists(_cache_path(key))
+
+
+def _cache_add(key):
+    path = _cache_path(key)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w'):
+            pass
+    except OSError:
+        logger.debug('Could not write to the cache: %s', path, exc_info=True)
+
+
+VerificationResult = namedtuple(
+    'VerificationResult', 'module name interfaces errors')
+VerificationResult.__doc__ = """The outcome of verifying one implementation.
+
+Attributes:
+    module (string): Module of the implementation, or of the import failure
+    name (string): Qualified name of the implementation class, or None when
+        the module could not be imported
+    interfaces (tuple): Dotted names of the interfaces
+    errors (tuple): `Violation` records; empty if the implementation is
+        valid
+"""
+
+
+def _dotted_name(cls):
+    return '{}.{}'.format(cls.__module__, cls.__qualname__)
+
+
+def find_modules(package):
+    """Returns the names of `package` and all of its submodules, found
+    without importing any of them.
+    """
+    spec = importlib.util.find_spec(package)
+    if spec is None:
+        raise ImportError('No module named {!r}'.format(package))
+    return [package] + _find_submodules(package,
+                                        spec.submodule_search_locations)
+
+
+def _find_submodules(package, paths):
+    names = []
+    for info in pkgutil.iter_modules(paths or (), package + '.'):
+        names.append(info.name)
+        if info.ispkg:
+            # finding the subpackage through its finder, unlike
+            # `importlib.util.find_spec`, doesn't import its parent
+            find_spec = getattr(info.module_finder, 'find_spec', None)
+            spec = find_spec(info.name) if find_spec else \
+                importlib.util.find_spec(info.name)
+            names.extend(_find_submodules(
+                info.name, spec and spec.submodule_search_locations))
+    return names
+
+
+# Modules imported while collecting implementations, whose results were
+# reported already
+_collected_modules = weakref.WeakSet()
+
+
+def verify_modules(modules, package=None):
+    """Imports `modules` and verifies every implementation decorated while
+    doing so. Returns a list of `VerificationResult`, restricted to classes
+    defined in `package` when given.
+
+    Implementations are only found while their module is imported, so
+    modules which were imported before, other than by `verify_modules`, are
+    reported as errors rather than silently skipped.
+    """
+    results = []
+    imported = set(sys.modules)
+    with collecting() as jobs:
+        for module in modules:
+            if module in imported:
+                results.extend(_imported_before(module))
+                continue
+            try:
+                importlib.import_module(module)
+            except Exception as exc:  # skipcq: PYL-W0703
+                results.append(VerificationResult(
+                    module, None, (), (_import_violation(module, exc),)))
+    _mark_collected(set(sys.modules) - imported)
+
+    for interfaces, cls in jobs:
+        if package and not (cls.__module__ == package or
+                            cls.__module__.startswith(package + '.')):
+            continue
+        try:
+            errors = verify_implementation(interfaces, cls)
+        except ValueError as exc:
+            errors = [exc.args[0]]
+        results.append(VerificationResult(
+            cls.__module__, cls.__qualname__,
+            tuple(_dotted_name(ifc) for ifc in interfaces),
+            tuple(error.portable() for error in errors)))
+    return results
+
+
+def _imported_before(module):
+    """Returns the error result of `module`, imported already, unless its
+    implementations were collected by `verify_modules`.
+    """
+    if sys.modules[module] in _collected_modules:
+        return []
+    return [VerificationResult(module, None, (), (Violation(
+        'import', module, None,
+        "'{}' was imported before verification, so its implementations "
+        "can't be collected; verify it in a new process".format(module),
+        None, None),))]
+
+
+def _mark_collected(names):
+    for name in names:
+        try:
+            _collected_modules.add(sys.modules[name])
+        except (KeyError, TypeError):
+            pass    # removed, None or not weakly referenceable
+
+
+def _configure_worker(config):
+    config['background'] = False
+    configure(**config)
+
+
+def _import_violation(module, exc):
+    return Violation('import', module, None,
+                     '{}: {}'.format(type(exc).__name__, exc), None, None)
+
+
+def verify_package(package, jobs=None):
+    """Verifies every implementation in `package` and its submodules.
+
+    The modules are split among a pool of `jobs` worker processes, started
+    afresh, which import them and run the verifications. Defaults to one
+    worker per CPU; with a single job everything runs in the current
+    process, unless part of the package was imported already. Returns the
+    merged `VerificationResult` list, sorted by module and class name.
+    """
+    modules = find_modules(package)
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(modules)))
+    if jobs == 1 and not any(module in sys.modules for module in modules):
+        results = verify_modules(modules, package)
+    else:
+        # contiguous chunks keep sibling modules, which tend to share their
+        # imports, in the same worker
+        size = -(-len(modules) // (jobs * 2))
+        chunks = [modules[i:i + size] for i in range(0, len(modules), size)]
+        from concurrent.futures import ProcessPoolExecutor
+        import multiprocessing
+        results = []
+        options = {}
+        if sys.version_info >= (3, 7):
+            # forked workers would inherit the modules imported already
+            options = dict(mp_context=multiprocessing.get_context('spawn'),
+                           initializer=_configure_worker,
+                           initargs=(get_config(),))
+        with ProcessPoolExecutor(max_workers=jobs, **options) as executor:
+            for chunk in executor.map(verify_modules, chunks,
+                                      [package] * len(chunks)):
+                results.extend(chunk)
+
+    # modules imported by several workers are verified more than once
+    unique = {(r.module, r.name, r.interfaces): r for r in results}
+    return sorted(unique.values(),
+                  key=lambda r: (r.module, r.name or '', r.interfaces))
+
+
+# -- entry point plugins
+
+
+def plugins(interface_cls, group=None):
+    """Returns the plugins declared as entry points of `group` as a
+    read-only mapping from entry point name to class. Only the metadata of
+    installed distributions is read here: each plugin is imported and
+    verified with `implements` when it is first looked up.
+
+    Args:
+        interface_cls: The interface the plugins must implement.
+        group: The entry point group. Defaults to the dotted name of
+            `interface_cls`, e.g. ``mypkg.interfaces.Flyable``.
+    """
+    if group is None:
+        group = _dotted_name(interface_cls)
+    return Plugins(interface_cls, group, _entry_points(group))
+
+
+def _entry_points(group):
+    try:
+        from importlib import metadata as importlib_metadata
+    except ImportError:  # Python < 3.8
+        from pkg_resources import iter_entry_points
+        found = iter_entry_points(group)
+    else:
+        found = importlib_metadata.entry_points()
+        if hasattr(found, 'select'):
+            found = found.select(group=group)
+        else:  # Python < 3.10
+            found = found.get(group, ())
+    entry_points = {}
+    for entry_point in found:
+        entry_points.setdefault(entry_point.name, entry_point)
+    return entry_points
+
+
+class Plugins(Mapping):
+    """Read-only mapping of the plugins implementing an interface, by entry
+    point name, which imports and verifies each plugin on first lookup. See
+    `plugins`.
+    """
+
+    def __init__(self, interface_cls, group, entry_points):
+        self.interface = interface_cls
+        self.group = group
+        self._entry_points = entry_points
+        self._loaded = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, name):
+        try:
+            return self._loaded[name]
+        except KeyError:
+            entry_point = self._entry_points[name]
+        with self._lock:
+            if name not in self._loaded:
+                self._loaded[name] = self._load(name, entry_point)
+        return self._loaded[name]
+
+    def _load(self, name, entry_point):
+        cls = entry_point.load()
+        if not isinstance(cls, type):
+            raise TypeError('Plugin {!r} of {!r} is not a class: {!r}'.format(
+                name, self.group, cls))
+        if not _is_registered(cls, self.interface):
+            implements(self.interface)(cls)
+        return cls
+
+    def __contains__(self, name):
+        return name in self._entry_points
+
+    def __iter__(self):
+        return iter(self._entry_points)
+
+    def __len__(self):
+        return len(self._entry_points)
+
+    def __repr__(self):
+        return '<{} {!r}: {}>'.format(
+            type(self).__name__, self.group, ', '.join(self._entry_points))
+
+
+# -- static checker
+
+class StaticSignature(namedtuple('StaticSignature', 'parameters returns')):
+    """A signature read from source code.
+
+    `parameters` is a tuple of `(kind, name, default, annotation)` where kind
+    is the name of an `inspect.Parameter` kind, and default and annotation
+    are source strings or None. Like `inspect.Signature`, the order of the
+    keyword-only parameters is ignored when comparing.
+    """
+    __slots__ = ()
+
+    def _key(self):
+        keyword_only = [p for p in self.parameters if p[0] == 'KEYWORD_ONLY']
+        return (tuple(p for p in self.parameters if p[0] != 'KEYWORD_ONLY'),
+                frozenset(keyword_only), self.returns)
+
+    def __eq__(self, other):
+        if not isinstance(other, StaticSignature):
+            return NotImplemented
+        return self._key() == other._key()
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self._key())
+
+    def __str__(self):
+        rendered = []
+        previous = None
+        for kind, name, default, annotation in self.parameters:
+            if previous == 'POSITIONAL_ONLY' and kind != previous:
+                rendered.append('/')
+            if kind == 'KEYWORD_ONLY' and previous not in (
+                    'VAR_POSITIONAL', 'KEYWORD_ONLY'):
+                rendered.append('*')
+            text = name
+            if kind == 'VAR_POSITIONAL':
+                text = '*' + name
+            elif kind == 'VAR_KEYWORD':
+                text = '**' + name
+            if annotation is not None:
+                text += ': ' + annotation
+            if default is not None:
+                text += (' = ' if annotation is not None else '=') + default
+            rendered.append(text)
+            previous = kind
+        if previous == 'POSITIONAL_ONLY':
+            rendered.append('/')
+        result = '({})'.format(', '.join(rendered))
+        if self.returns is not None:
+            result += ' -> ' + self.returns
+        return result
+
+
+StaticMember = namedtuple('StaticMember', 'kind signature kinds accessors')
+StaticMember.__doc__ = """A class member read from source code. `kind` is one
+of 'method', 'property', 'attribute', 'class' or 'unknown' when the source
+doesn't tell. Methods have a `signature` and `kinds`, properties have
+`accessors` mapping 'fget', 'fset' and 'fdel' to signatures."""
+
+StaticClass = namedtuple(
+    'StaticClass', 'module qualname lineno bases members interfaces')
+StaticClass.__doc__ = """A class read from source code. `bases` and
+`interfaces` (the arguments of `@implements`, or None when the class isn't
+decorated) are dotted names, resolved as far as the module allows."""
+
+StaticModule = namedtuple('StaticModule', 'name path classes aliases error')
+StaticModule.__doc__ = """The classes of a source file and its module-level
+names bound to other modules' objects, used to follow re-exports."""
+
+_LITERALS = tuple(getattr(ast, name) for name in (
+    'Constant', 'Num', 'Str', 'Bytes', 'NameConstant', 'JoinedStr', 'List',
+    'Tuple', 'Set', 'Dict', 'ListComp', 'SetComp', 'DictComp')
+    if hasattr(ast, name))
+
+_FUNCTION_NODES = (ast.FunctionDef, ast.AsyncFunctionDef)
+
+
+def _source(node):
+    if node is None:
+        return None
+    if hasattr(ast, 'unparse'):
+        return ast.unparse(node)
+    return ast.dump(node)
+
+
+def _module_name(path):
+    dirname, filename = os.path.split(os.path.abspath(path))
+    name = os.path.splitext(filename)[0]
+    parts = [] if name == '__init__' else [name]
+    while os.path.exists(os.path.join(dirname, '__init__.py')):
+        dirname, package = os.path.split(dirname)
+        parts.insert(0, package)
+    return '.'.join(parts)
+
+
+def _static_signature(node, bound=False):
+    args = node.args
+    posonly = getattr(args, 'posonlyargs', [])
+    positional = posonly + args.args
+    defaults = ([None] * (len(positional) - len(args.defaults)) +
+                [_source(d) for d in args.defaults])
+    parameters = []
+    for i, (arg, default) in enumerate(zip(positional, defaults)):
+        kind = 'POSITIONAL_ONLY' if i < len(posonly) else \
+            'POSITIONAL_OR_KEYWORD'
+        parameters.append((kind, arg.arg, default, _source(arg.annotation)))
+    if args.vararg:
+        parameters.append(('VAR_POSITIONAL', args.vararg.arg, None,
+                           _source(args.vararg.annotation)))
+    for arg, default in zip(args.kwonlyargs, args.kw_defaults):
+        parameters.append(('KEYWORD_ONLY', arg.arg, _source(default),
+                           _source(arg.annotation)))
+    if args.kwarg:
+        parameters.append(('VAR_KEYWORD', args.kwarg.arg, None,
+                           _source(args.kwarg.annotation)))
+    if bound and parameters and parameters[0][0] in (
+            'POSITIONAL_ONLY', 'POSITIONAL_OR_KEYWORD'):
+        parameters = parameters[1:]
+    return StaticSignature(tuple(parameters),
+                           _source(getattr(node, 'returns', None)))
+
+
+def _yields(node):
+    nodes = list(ast.iter_child_nodes(node))
+    while nodes:
+        child = nodes.pop()
+        if isinstance(child, (ast.Yield, ast.YieldFrom)):
+            return True
+        if not isinstance(child, _FUNCTION_NODES + (ast.Lambda, ast.ClassDef)):
+            nodes.extend(ast.iter_child_nodes(child))
+    return False
+
+
+def _static_kinds(node, decorators):
+    kinds = [kind for kind in ('classmethod', 'staticmethod')
+             if kind in decorators]
+    is_async = isinstance(node, ast.AsyncFunctionDef)
+    if _yields(node):
+        kinds.append('asyncgenfunction' if is_async else 'generatorfunction')
+    elif is_async:
+        kinds.append('coroutinefunction')
+    return tuple(kinds)
+
+
+def _static_members(body):
+    members = {}
+    for stmt in body:
+        if isinstance(stmt, _FUNCTION_NODES):
+            _add_static_function(members, stmt)
+        elif isinstance(stmt, ast.ClassDef):
+            members[stmt.name] = StaticMember('class', None, (), None)
+        elif isinstance(stmt, (ast.Assign, ast.AnnAssign)):
+            _add_static_assignment(members, stmt)
+    return members
+
+
+def _add_static_assignment(members, node):
+    targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+    value = node.value
+    if value is None:
+        # a bare annotation declares an instance attribute
+        member = StaticMember('attribute', None, (), None)
+    elif isinstance(value, ast.Lambda):
+        member = StaticMember('method', _static_signature(value), (), None)
+    elif isinstance(value, _LITERALS):
+        member = StaticMember('attribute', None, (), None)
+    else:
+        member = StaticMember('unknown', None, (), None)
+    for target in targets:
+        if isinstance(target, ast.Name):
+            members[target.id] = member
+            if target.id == '__slots__':
+                for name in _static_slots(value):
+                    members.setdefault(name, StaticMember(
+                        'attribute', None, (), None))
+
+
+def _static_slots(node):
+    """Returns the names listed by the `__slots__` literal `node`."""
+    if isinstance(node, (ast.Tuple, ast.List, ast.Set)):
+        nodes = node.elts
+    elif isinstance(node, ast.Dict):
+        nodes = node.keys
+    else:
+        nodes = [node]
+    values = (n.value if isinstance(n, ast.Constant) else getattr(n, 's', None)
+              for n in nodes)   # ast.Str before Python 3.8
+    return [value for value in values if isinstance(value, str)]
+
+
+def _add_static_function(members, node):
+    decorators = []
+    for decorator in node.decorator_list:
+        if isinstance(decorator, ast.Name):
+            decorators.append(decorator.id)
+        elif isinstance(decorator, ast.Attribute) and \
+                isinstance(decorator.value, ast.Name) and \
+                decorator.value.id == node.name and \
+                decorator.attr in ('setter', 'deleter'):
+            decorators.append(decorator.attr)
+
+    if 'property' in decorators:
+        members[node.name] = StaticMember(
+            'property', None, (), {'fget': _static_signature(node)})
+    elif 'setter' in decorators or 'deleter' in decorators:
+        prop = members.get(node.name)
+        if prop is not None and prop.kind == 'property':
+            attr = 'fset' if 'setter' in decorators else 'fdel'
+            accessors = dict(prop.accessors)
+            accessors[attr] = _static_signature(node)
+            members[node.name] = prop._replace(accessors=accessors)
+        else:
+            members[node.name] = StaticMember('unknown', None, (), None)
+    else:
+        members[node.name] = StaticMember(
+            'method',
+            _static_signature(node, bound='classmethod' in decorators),
+            _static_kinds(node, decorators), None)
+
+
+class _ModuleReader:
+    """Collects the classes of a module, resolving the names used in bases
+    and decorators through the imports and definitions that precede them.
+    """
+
+    def __init__(self, name, is_package):
+        self.name = name
+        self.package = name if is_package else name.rpartition('.')[0]
+        self.scopes = [{}]
+        self.classes = []
+
+    def resolve(self, node):
+        if isinstance(node, ast.Name):
+            for scope in reversed(self.scopes):
+                if node.id in scope:
+                    return scope[node.id]
+            if node.id in dir(builtins):
+                return 'builtins.' + node.id
+            return '{}.{}'.format(self.name, node.id)
+        if isinstance(node, ast.Attribute):
+            value = self.resolve(node.value)
+            return value and '{}.{}'.format(value, node.attr)
+        return None
+
+    def visit(self, body, prefix=''):
+        for stmt in body:
+            if isinstance(stmt, ast.Import):
+                self.visit_import(stmt)
+            elif isinstance(stmt, ast.ImportFrom):
+                self.visit_import_from(stmt)
+            elif isinstance(stmt, ast.ClassDef):
+                self.visit_class(stmt, prefix)
+            elif isinstance(stmt, _FUNCTION_NODES):
+                self.visit_function(stmt, prefix)
+            else:
+                for field in ('body', 'orelse', 'finalbody', 'handlers'):
+                    nested = getattr(stmt, field, None)
+                    if nested:
+                        self.visit(nested, prefix)
+
+    def visit_import(self, node):
+        scope = self.scopes[-1]
+        for alias in node.names:
+            if alias.asname:
+                scope[alias.asname] = alias.name
+            else:
+                name = alias.name.partition('.')[0]
+                scope[name] = name
+
+    def visit_import_from(self, node):
+        module = node.module or ''
+        if node.level:
+            parts = self.package.split('.')
+            base = '.'.join(parts[:len(parts) - node.level + 1])
+            module = '.'.join(p for p in (base, module) if p)
+        for alias in node.names:
+            self.scopes[-1][alias.asname or alias.name] = '{}.{}'.format(
+                module, alias.name)
+
+    def visit_function(self, node, prefix):
+        self.scopes[-1][node.name] = '{}.{}{}'.format(
+            self.name, prefix, node.name)
+        self.scopes.append({})
+        self.visit(node.body, prefix + node.name + '.<locals>.')
+        self.scopes.pop()
+
+    def visit_class(self, node, prefix):
+        qualname = prefix + node.name
+        interfaces = None
+        for decorator in node.decorator_list:
+            if isinstance(decorator, ast.Call) and self.resolve(
+                    decorator.func) == 'implements.implements':
+                interfaces = (interfaces or ()) + tuple(
+                    self.resolve(arg) for arg in decorator.args)
+        self.classes.append(StaticClass(
+            self.name, qualname, node.lineno,
+            tuple(self.resolve(base) for base in node.bases),
+            _static_members(node.body), interfaces))
+        self.scopes[-1][node.name] = '{}.{}'.format(self.name, qualname)
+        self.scopes.append({})
+        self.visit(node.body, qualname + '.')
+        self.scopes.pop()
+
+
+def read_module(path):
+    """Parses the source file at `path`, without executing it, and returns a
+    `StaticModule`.
+    """
+    name = _module_name(path)
+    try:
+        with open(path, 'rb') as f:
+            tree = ast.parse(f.read(), path)
+    except (SyntaxError, ValueError, OSError) as exc:
+        return StaticModule(name, path, [], {}, '{}: {}'.format(
+            type(exc).__name__, exc))
+    reader = _ModuleReader(name, os.path.basename(path) == '__init__.py')
+    reader.visit(tree.body)
+    aliases = {key: value for key, value in reader.scopes[0].items()
+               if value != '{}.{}'.format(name, key)}
+    return StaticModule(name, path, reader.classes, aliases, None)
+
+
+def find_sources(paths):
+    """Returns the Python source files in `paths`, searching directories
+    recursively.
+    """
+    sources = []
+    for path in paths:
+        if not os.path.isdir(path):
+            sources.append(path)
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs[:] = sorted(d for d in dirs
+                             if not d.startswith('.') and d != '__pycache__')
+            sources.extend(os.path.join(root, f)
+                           for f in sorted(files) if f.endswith('.py'))
+    return sources
+
+
+class StaticIndex:
+    """The classes of a set of `StaticModule`, looked up by dotted name.
+
+    Computes the static equivalent of each class' MRO and members, and
+    checks implementations against their interfaces.
+    """
+
+    _ROOTS = ('builtins.object', 'implements.Interface')
+
+    def __init__(self, modules=()):
+        self.classes = {}
+        self.aliases = {}
+        self._mros = {}
+        for module in modules:
+            self.add(module)
+
+    def add(self, module):
+        self.aliases[module.name] = module.aliases
+        for cls in module.classes:
+            self.classes['{}.{}'.format(cls.module, cls.qualname)] = cls
+        self._mros.clear()
+
+    def remove(self, module_name):
+        self.aliases.pop(module_name, None)
+        for name in [n for n, c in self.classes.items()
+                     if c.module == module_name]:
+            del self.classes[name]
+        self._mros.clear()
+
+    def lookup(self, name, trail=None):
+        """Returns the dotted name `name` refers to once re-exports are
+        followed, and the `StaticClass` defined there, if any. The names
+        followed are added to the `trail` set, if given.
+        """
+        for _ in range(32):
+            if trail is not None and name is not None:
+                trail.add(name)
+            if name is None or name in self.classes:
+                break
+            module, _, attr = name.rpartition('.')
+            target = self.aliases.get(module, {}).get(attr)
+            if target is None or target == name:
+                break
+            name = target
+        return name, self.classes.get(name)
+
+    def mro(self, name):
+        """Returns the linearized class hierarchy of `name`, excluding the
+        roots, and whether classes the index doesn't know of are part of it.
+        """
+        if name not in self._mros:
+            self._mros[name] = ([name], True)   # guards against cycles
+            self._mros[name] = self._linearize(name)
+        return self._mros[name]
+
+    def _linearize(self, name):
+        cls = self.classes[name]
+        sequences = []
+        unresolved = False
+        bases = []
+        for base in cls.bases:
+            base, base_cls = self.lookup(base)
+            if base in self._ROOTS:
+                continue
+            bases.append(base)
+            if base_cls is None:
+                unresolved = True
+                sequences.append([base])
+            else:
+                base_mro, base_unresolved = self.mro(base)
+                unresolved = unresolved or base_unresolved
+                sequences.append(list(base_mro))
+        sequences.append(bases)
+        result = [name]
+        sequences = [s for s in sequences if s]
+        while sequences:
+            for sequence in sequences:
+                head = sequence[0]
+                if not any(head in s[1:] for s in sequences):
+                    break
+            else:
+                return result, True     # inconsistent hierarchy
+            result.append(head)
+            sequences = [s[1:] if s[0] == head else s for s in sequences]
+            sequences = [s for s in sequences if s]
+        return result, unresolved
+
+    def members(self, name):
+        members = {}
+        for base in self.mro(name)[0]:
+            if base in self.classes:
+                for key, member in self.classes[base].members.items():
+                    members.setdefault(key, member)
+        return members
+
+    def check(self, cls):
+        """Returns the errors of the implementation `cls`, a `StaticClass`
+        decorated with `@implements`.
+        """
+        errors = []
+        name = '{}.{}'.format(cls.module, cls.qualname)
+        cls_mro, unresolved = self.mro(name)
+        members = self.members(name)
+        cls_name = cls.qualname.rpartition('.')[2]
+        for interface in cls.interfaces:
+            interface, interface_cls = self.lookup(interface)
+            if interface_cls is None:
+                errors.append(Violation('interface', None, None, None,
+                                        cls_name, interface))
+                continue
+            common = set(self.mro(interface)[0]) & set(cls_mro)
+            if common:
+                errors.append(Violation(
+                    'hierarchy', None, None, tuple(sorted(common)), cls_name,
+                    interface_cls.qualname.rpartition('.')[2]))
+                continue
+            ifc_name = interface_cls.qualname.rpartition('.')[2]
+            for key, member in sorted(self.members(interface).items()):
+                errors.extend(_check_static_member(
+                    key, member, members.get(key), unresolved,
+                    ifc_name, cls_name))
+            if self.slotted(interface):
+                # only the classes read can be told to lack __slots__
+                adding = tuple(
+                    self.classes[c].qualname.rpartition('.')[2]
+                    for c in cls_mro if c in self.classes and
+                    '__slots__' not in self.classes[c].members)
+                if adding:
+                    errors.append(Violation('slots', '__dict__', None,
+                                            adding, cls_name, ifc_name))
+        return errors
+
+    def slotted(self, name):
+        """Returns whether a class of the hierarchy of `name` declares
+        `__slots__`.
+        """
+        return any('__slots__' in self.classes[c].members
+                   for c in self.mro(name)[0] if c in self.classes)
+
+
+def _static_key(signature):
+    """Returns `signature` with its annotations normalized, as strings since
+    nothing is evaluated statically, unless they are compared 'exact'ly.
+    """
+    if _config['annotations'] == 'exact':
+        return signature
+
+    def normalize(annotation):
+        return None if annotation is None else _annotation_string(annotation)
+
+    return StaticSignature(
+        tuple((kind, name, default, normalize(annotation))
+              for kind, name, default, annotation in signature.parameters),
+        normalize(signature.returns))
+
+
+def _check_static_member(name, ifc, cls, unresolved, ifc_name, cls_name):
+    if cls is None and unresolved or name in _BORING and ifc.kind != 'method':
+        return []   # may be defined by a class we haven't read
+    if cls is not None and cls.kind == 'unknown':
+        return []
+    if ifc.kind == 'method':
+        return _check_static_method(name, ifc, cls, ifc_name, cls_name)
+    errors = []
+    if ifc.kind == 'property':
+        errors.extend(_check_static_property(
+            name, ifc, cls, ifc_name, cls_name))
+    if ifc.kind == 'class':
+        return errors
+    if cls is None or ifc.kind != 'unknown' and cls.kind in ('method',
+                                                             'class'):
+        errors.append(Violation('attribute', name, None, cls and cls.kind,
+                                cls_name, ifc_name))
+    return errors
+
+
+def _check_static_method(name, ifc, cls, ifc_name, cls_name):
+    errors = []
+    for kind in ifc.kinds:
+        if cls is None or kind not in cls.kinds:
+            errors.append(Violation(
+                'method_kind', name, _METHOD_KINDS[kind][1],
+                cls and cls.kinds, cls_name, ifc_name))
+    if cls is None or cls.kind != 'method' or \
+            _static_key(cls.signature) != _static_key(ifc.signature):
+        errors.append(Violation(
+            'method', name, ifc.signature, cls and cls.signature,
+            cls_name, ifc_name))
+    return errors
+
+
+def _check_static_property(name, ifc, cls, ifc_name, cls_name):
+    errors = []
+    for attr, signature in sorted(ifc.accessors.items()):
+        proptype = _PROPERTY_ACCESSORS[attr]
+        if cls is None or cls.kind != 'property' or \
+                attr not in cls.accessors:
+            errors.append(Violation('accessor', name, proptype, None,
+                                    cls_name, ifc_name))
+        elif _static_key(cls.accessors[attr]) != _static_key(signature):
+            errors.append(Violation(
+                'accessor_signature', name, proptype,
+                cls.accessors[attr], cls_name, ifc_name))
+    return errors
+
+
+def check_sources(paths, jobs=None):
+    """Statically verifies the implementations found in the Python files of
+    `paths`, without importing them.
+
+    Files are parsed in a pool of `jobs` worker processes, defaulting to one
+    per CPU. Interfaces and base classes are resolved across all the files
+    read. Returns a list of `VerificationResult`, sorted by module and name.
+    """
+    modules = read_modules(find_sources(paths), jobs)
+    return _check_index(StaticIndex(modules), modules)
+
+
+def read_modules(sources, jobs=None):
+    """Returns the `StaticModule` of each file in `sources`, parsed in a
+    pool of `jobs` worker processes.
+    """
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(sources)))
+    if jobs == 1:
+        return [read_module(path) for path in sources]
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(
+            read_module, sources,
+            chunksize=max(1, len(sources) // (jobs * 4))))
+
+
+def _read_violation(module):
+    return Violation('import', module.name, None, module.error, None, None)
+
+
+def _check_index(index, modules):
+    results = []
+    for module in modules:
+        if module.error:
+            results.append(VerificationResult(
+                module.name, None, (), (_read_violation(module),)))
+        for cls in module.classes:
+            if cls.interfaces is not None:
+                results.append(VerificationResult(
+                    cls.module, cls.qualname,
+                    tuple(index.lookup(i)[0] or '?' for i in cls.interfaces),
+                    tuple(index.check(cls))))
+    return sorted(results, key=lambda r: (r.module, r.name or ''))
+
+
+# -- watch daemon
+
+class CheckDaemon:
+    """Keeps the static view of source trees in memory and, when files
+    change, re-checks only the implementations affected by the change.
+
+    Each implementation depends on the classes of its hierarchy, on its
+    interfaces and their hierarchies, and on the names followed to resolve
+    them; a reverse index from those names to the implementations tells
+    which ones to re-check.
+    """
+
+    def __init__(self, paths, jobs=None):
+        self.paths = paths
+        self.jobs = jobs
+        self.index = StaticIndex()
+        self.results = {}
+        self._lock = threading.Lock()
+        self._stamps = {}
+        self._modules = {}
+        self._paths = {}
+        self._fingerprints = {}
+        self._dependencies = {}
+        self._dependents = {}
+        self.refresh()
+
+    def refresh(self):
+        """Reads the files which changed since the last call and re-checks
+        the affected implementations. Returns their names.
+        """
+        with self._lock:
+            stamps = {}
+            for path in find_sources(self.paths):
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                stamps[path] = (stat.st_mtime_ns, stat.st_size)
+            changed = set()
+            for path in set(self._stamps) - set(stamps):
+                changed.update(self._update(path, None))
+            paths = [path for path, stamp in stamps.items()
+                     if self._stamps.get(path) != stamp]
+            for path, module in zip(paths, read_modules(paths, self.jobs)):
+                changed.update(self._update(path, module))
+            self._stamps = stamps
+            return self._recheck(changed)
+
+    def query(self, paths=None):
+        """Refreshes, then returns the `VerificationResult` list of the
+        implementations and modules in `paths`, or all of them.
+        """
+        self.refresh()
+        with self._lock:
+            results = list(self.results.values())
+        if paths:
+            paths = [os.path.abspath(p) for p in paths]
+            results = [r for r in results if any(
+                self._paths.get(r.module, '') == p or
+                self._paths.get(r.module, '').startswith(
+                    os.path.join(p, '')) for p in paths)]
+        return sorted(results, key=lambda r: (r.module, r.name or ''))
+
+    def _update(self, path, module):
+        old = self._modules.pop(path, None)
+        changed = set()
+        previous = {}
+        if old is not None:
+            self.index.remove(old.name)
+            self.results.pop(old.name, None)
+            aliases = module.aliases if module is not None else {}
+            for key in set(old.aliases) | set(aliases):
+                if old.aliases.get(key) != aliases.get(key):
+                    changed.add('{}.{}'.format(old.name, key))
+            for cls in old.classes:
+                name = '{}.{}'.format(cls.module, cls.qualname)
+                previous[name] = self._fingerprints.pop(name, None)
+                changed.add(name)
+        if module is None:
+            return changed
+
+        self._modules[path] = module
+        self._paths[module.name] = os.path.abspath(path)
+        self.index.add(module)
+        if module.error:
+            self.results[module.name] = VerificationResult(
+                module.name, None, (), (_read_violation(module),))
+        for cls in module.classes:
+            name = '{}.{}'.format(cls.module, cls.qualname)
+            key = _digest(repr(cls))
+            if previous.get(name) == key:
+                changed.discard(name)
+            else:
+                changed.add(name)
+            self._fingerprints[name] = key
+        return changed
+
+    def _recheck(self, changed):
+        affected = set()
+        for name in changed:
+            affected.update(self._dependents.get(name, ()))
+            affected.add(name)
+        rechecked = []
+        for name in sorted(affected):
+            self._forget(name)
+            cls = self.index.classes.get(name)
+            if cls is None or cls.interfaces is None:
+                continue
+            self._track(name, cls)
+            self.results[name] = VerificationResult(
+                cls.module, cls.qualname,
+                tuple(self.index.lookup(i)[0] or '?' for i in cls.interfaces),
+                tuple(self.index.check(cls)))
+            rechecked.append(name)
+        return rechecked
+
+    def _forget(self, name):
+        self.results.pop(name, None)
+        for dependency in self._dependencies.pop(name, ()):
+            dependents = self._dependents.get(dependency)
+            if dependents is not None:
+                dependents.discard(name)
+                if not dependents:
+                    del self._dependents[dependency]
+
+    def _track(self, name, cls):
+        dependencies = set()
+        roots = [name]
+        for interface in cls.interfaces:
+            resolved, _ = self.index.lookup(interface, dependencies)
+            roots.append(resolved)
+        for root in roots:
+            for base in self.index.mro(root)[0]:
+                dependencies.add(base)
+                base_cls = self.index.classes.get(base)
+                for raw in base_cls.bases if base_cls else ():
+                    self.index.lookup(raw, dependencies)
+        self._dependencies[name] = dependencies
+        for dependency in dependencies:
+            self._dependents.setdefault(dependency, set()).add(name)
+
+
+def _address(address):
+    import socket
+    host, sep, port = address.rpartition(':')
+    if sep and port.isdigit():
+        return socket.AF_INET, (host or '127.0.0.1', int(port))
+    return socket.AF_UNIX, address
+
+
+def _handle(daemon, request, client_address, server):
+    """Answers the queries of one client connection of `serve`."""
+    import json
+    with request.makefile('rb') as rfile, request.makefile('wb') as wfile:
+        for line in rfile:
+            try:
+                paths = json.loads(line.decode()).get('paths')
+                response = {'results': [_result_json(r)
+                                        for r in daemon.query(paths)]}
+            except Exception as exc:  # skipcq: PYL-W0703
+                response = {'error': '{}: {}'.format(
+                    type(exc).__name__, exc)}
+            wfile.write(json.dumps(response).encode() + b'\n')
+            wfile.flush()
+
+
+class _Server:
+    """A threaded socket server answering queries on a `CheckDaemon`, which
+    it refreshes every `interval` seconds until shut down.
+    """
+
+    def __init__(self, daemon, address, interval):
+        import socket
+        import socketserver
+        family, self.address = _address(address)
+        self.unix = family == socket.AF_UNIX
+        server_cls = socketserver.ThreadingTCPServer
+        if self.unix:
+            server_cls = socketserver.ThreadingUnixStreamServer
+            self._unlink()
+        self.daemon = daemon
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.server = server_cls(
+            self.address, functools.partial(_handle, daemon),
+            bind_and_activate=False)
+        self.server.allow_reuse_address = True
+        self.server.daemon_threads = True
+        try:
+            self.server.server_bind()
+            self.server.server_activate()
+        except BaseException:
+            self.server.server_close()
+            raise
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever,
+                         daemon=True).start()
+        threading.Thread(target=self.poll, daemon=True).start()
+
+    def poll(self):
+        while not self.stopped.wait(self.interval):
+            self.daemon.refresh()
+
+    def shutdown(self):
+        self.stopped.set()
+        self.server.shutdown()
+        self.server.server_close()
+        self._unlink()
+
+    def _unlink(self):
+        if self.unix and os.path.exists(self.address):
+            os.unlink(self.address)
+
+
+def serve(daemon, address, interval=1.0):
+    """Serves the results of `daemon` on `address`, a Unix socket path or
+    `host:port`, polling for changed files every `interval` seconds.
+
+    Clients send one JSON object per line, `{"paths": [...]}`, and receive
+    one line with `{"results": [...]}`. Returns the server, running in
+    background threads; call its `shutdown()` to stop it.
+    """
+    server = _Server(daemon, address, interval)
+    server.start()
+    return server
+
+
+def query(address, paths=None):
+    """Asks the daemon serving on `address` for the results of `paths`, or
+    of everything it watches. Returns a list of `VerificationResult`.
+    """
+    import json
+    import socket
+    family, address = _address(address)
+    with socket.socket(family, socket.SOCK_STREAM) as sock:
+        sock.connect(address)
+        sock.sendall(json.dumps({'paths': paths}).encode() + b'\n')
+        with sock.makefile('rb') as f:
+            response = json.loads(f.readline().decode())
+    if 'error' in response:
+        raise RuntimeError(response['error'])
+    return [VerificationResult(
+        r['module'], r['name'], tuple(r['interfaces']),
+        tuple(_violation_from_json(e) for e in r['errors']))
+        for r in response['results']]
+
+
+def _result_json(result):
+    values = dict(result._asdict())
+    values['errors'] = [error.as_dict() for error in result.errors]
+    return values
+
+
+def _violation_from_json(values):
+    return Violation(*(
+        tuple(value) if isinstance(value, list) else value
+        for value in (values[field] for field in Violation._fields)))
+
+
+def _print_results(results, as_json):
+    failures = [r for r in results if r.errors]
+    if as_json:
+        import json
+        print(json.dumps([_result_json(r) for r in results], indent=2))
+        return failures
+    for result in failures:
+        print('{}.{}:'.format(result.module, result.name or '<module>'))
+        for error in result.errors:
+            print('- {}'.format(error))
+    verified = [r for r in results if r.name]
+    print('Verified {} implementations: {} failed'.format(
+        len(verified), len([r for r in verified if r.errors])))
+    broken = len(results) - len(verified)
+    if broken:
+        print('{} modules could not be imported'.format(broken))
+    return failures
+
+
+def main(argv=None):
+    """Command-line entry point of `python -m implements`, with the
+    `verify`, `check`, `watch` and `query` commands.
+    """
+    import argparse
+    parser = argparse.ArgumentParser(
+        prog='python -m implements',
+        description='Verify interface implementations.')
+    commands = parser.add_subparsers(dest='command')
+    commands.required = True
+
+    verify = commands.add_parser(
+        'verify', help='import a package and verify its implementations')
+    verify.add_argument('package', help='dotted name of the package')
+    verify.add_argument('-j', '--jobs', type=int, default=None,
+                        help='number of worker processes (default: CPUs)')
+    verify.add_argument('--json', action='store_true',
+                        help='print the results as JSON')
+
+    check = commands.add_parser(
+        'check', help='verify implementations from source, without importing')
+    check.add_argument('paths', nargs='+', help='files or directories')
+    check.add_argument('-j', '--jobs', type=int, default=None,
+                       help='number of worker processes (default: CPUs)')
+    check.add_argument('--json', action='store_true',
+                       help='print the results as JSON')
+
+    watch = commands.add_parser(
+        'watch', help='check sources, then serve results as files change')
+    watch.add_argument('paths', nargs='+', help='files or directories')
+    watch.add_argument('-j', '--jobs', type=int, default=None,
+                       help='number of worker processes (default: CPUs)')
+    watch.add_argument('--socket', default='.implements.sock',
+                       help='Unix socket path or host:port to serve on')
+    watch.add_argument('--interval', type=float, default=1.0,
+                       help='seconds between checks for changed files')
+
+    ask = commands.add_parser(
+        'query', help='get results from a running watch daemon')
+    ask.add_argument('paths', nargs='*', help='files or directories')
+    ask.add_argument('--socket', default='.implements.sock',
+                     help='Unix socket path or host:port of the daemon')
+    ask.add_argument('--json', action='store_true',
+                     help='print the results as JSON')
+
+    args = parser.parse_args(argv)
+    if args.command == 'watch':
+        server = serve(CheckDaemon(args.paths, jobs=args.jobs), args.socket,
+                       interval=args.interval)
+        print('Serving results on {}'.format(args.socket))
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            server.shutdown()
+        return 0
+    if args.command == 'query':
+        results = query(args.socket, args.paths or None)
+    elif args.command == 'check':
+        results = check_sources(args.paths, jobs=args.jobs)
+    else:
+        results = verify_package(args.package, jobs=args.jobs)
+    failures = _print_results(results, args.json)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    # run the CLI from the importable module, not this `__main__` copy, so
+    # that implementations register with the same `implements` module
+    from implements import main as _main
+    sys.exit(_main())
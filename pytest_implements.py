@@ -0,0 +1,150 @@
+# Copyright 2017-2020 Kamil Sindi
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""pytest plugin verifying, in one batch, every implementation decorated with
+`@implements` while the test session is collected.
+
+Enable it with `--implements` or the `implements = true` ini option. Failures
+are reported by a single `implements` test item, and successes are recorded
+in the pytest cache directory so that xdist workers and later sessions skip
+the implementations which didn't change.
+"""
+
+import time
+
+import pytest
+
+import implements
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('implements')
+    group.addoption(
+        '--implements', action='store_true', default=False,
+        help='verify the @implements classes imported during collection in '
+             'one batch')
+    group.addoption(
+        '--implements-durations', type=int, default=5, metavar='N',
+        help='show the N slowest verifications (default: 5)')
+    parser.addini(
+        'implements', type='bool', default=False,
+        help='verify the @implements classes imported during collection in '
+             'one batch')
+
+
+def pytest_configure(config):
+    if config.getoption('implements') or config.getini('implements'):
+        config.pluginmanager.register(
+            BatchVerifier(config), 'implements-batch')
+
+
+class BatchVerifier:
+    """Records the implementations decorated during collection, then
+    verifies them all once collection is over.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.timings = []
+        self.failures = []
+        self._cache_dir = None
+        if not implements.get_config()['cache_dir'] and \
+                getattr(config, 'cache', None) is not None:
+            self._cache_dir = str(config.cache.mkdir('implements'))
+            implements.configure(cache_dir=self._cache_dir)
+        self._collecting = implements.collecting()
+        self._jobs = self._collecting.__enter__()
+
+    def pytest_unconfigure(self):
+        self._stop_collecting()
+        if self._cache_dir:
+            implements.configure(cache_dir='')
+
+    def _stop_collecting(self):
+        if self._collecting is not None:
+            self._collecting.__exit__(None, None, None)
+            self._collecting = None
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_collection_modifyitems(self, session, items):
+        self._stop_collecting()
+        for interfaces, cls in self._jobs:
+            self._verify(interfaces, cls)
+        workeroutput = getattr(self.config, 'workeroutput', None)
+        if workeroutput is not None:
+            # xdist workers hand their timings over to the controller
+            workeroutput['implements_timings'] = self.timings
+        if self._jobs:
+            items.append(VerificationItem.from_parent(
+                session, name='implements', failures=self.failures))
+
+    def _verify(self, interfaces, cls):
+        start = time.perf_counter()
+        try:
+            errors = implements.verify_implementation(interfaces, cls)
+        except ValueError as exc:
+            errors = [exc.args[0]]
+        self.timings.append((time.perf_counter() - start,
+                             '{}.{}'.format(cls.__module__, cls.__qualname__)))
+        rate = implements.get_config()['enforce']
+        if errors:
+            self.failures.append(implements.ImplementationError(errors, cls))
+        elif rate:
+            implements.enforce(interfaces, cls, rate, implements.get_mode())
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_testnodedown(self, node, error):
+        # every xdist worker verifies the same classes; keep the slowest
+        slowest = dict((name, duration) for duration, name in self.timings)
+        for duration, name in getattr(node, 'workeroutput', {}).get(
+                'implements_timings', ()):
+            slowest[name] = max(duration, slowest.get(name, 0.0))
+        self.timings = [(duration, name)
+                        for name, duration in slowest.items()]
+
+    def pytest_terminal_summary(self, terminalreporter):
+        count = self.config.getoption('implements_durations')
+        if not self.timings or count <= 0:
+            return
+        terminalreporter.write_sep(
+            '=', 'slowest {} implements verifications'.format(count))
+        for duration, name in sorted(self.timings,
+                                     key=lambda t: -t[0])[:count]:
+            terminalreporter.write_line('{:.4f}s {}'.format(duration, name))
+
+
+class VerificationError(implements.VerificationFailures):
+    pass
+
+
+class VerificationItem(pytest.Item):
+    """Fails with the errors of every implementation verified in the batch
+    which didn't pass.
+    """
+
+    def __init__(self, failures, **kwargs):
+        super().__init__(**kwargs)
+        self.failures = failures
+
+    def runtest(self):
+        if self.failures:
+            raise VerificationError(self.failures)
+
+    def repr_failure(self, excinfo, style=None):
+        if isinstance(excinfo.value, VerificationError):
+            return str(excinfo.value)
+        return super().repr_failure(excinfo, style)
+
+    def reportinfo(self):
+        return getattr(self, 'path', None) or self.fspath, None, self.name
@@ -36,7 +36,8 @@ if __name__ == '__main__':
         all_packages=_ALL_PACKAGES,
         zip_safe=False,
         include_package_data=True,
-        py_modules=['implements'],
+        py_modules=['implements', 'pytest_implements'],
+        entry_points={'pytest11': ['implements = pytest_implements']},
         classifiers=textwrap.dedent("""
             Development Status :: 5 - Production/Stable
             Intended Audience :: Developers
@@ -12,15 +12,46 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import abc
+import collections.abc
+import functools
+import gc
+import importlib
+import inspect
+import json
+import logging
+import os
 import sys
+import threading
+import time
+import typing
+import weakref
 import pytest
 
-from implements import Interface, implements, get_mro
+from implements import (
+    Interface, implements, get_mro, get_spec, get_members, get_attributes,
+    configure, get_mode, wait, verify_package, verify_modules, main,
+    fingerprint, check_sources, CheckDaemon, serve, signature_facts,
+    normalize_annotation,
+    get_implementations, get_interfaces, conforms, accepts, dispatch, plugins,
+    stats, reset_stats, add_hook, remove_hook, ImplementationError, Violation,
+    VerificationFailures
+)
+
+
+pytest_plugins = 'pytester'
 
 
 py36 = pytest.mark.skipif(sys.version_info < (3, 6), reason='requires py3.6')
 
 
+@pytest.fixture
+def mode():
+    previous = get_mode()
+    yield configure
+    configure(mode=previous)
+
+
 def test_empty():
     class FooInterface(Interface):
         pass
@@ -981,3 +1012,1593 @@ def test_implementation_inheriting_from_interface():
         class FooImplemenation(FooInterface):
             def abc(self) -> str:
                 pass
+
+
+def test_interface_spec():
+    class FooInterface(Interface):
+        bar = None
+
+        @property
+        def baz(self) -> str:
+            pass
+
+        @classmethod
+        def foo(cls, a):
+            pass
+
+    spec = get_spec(FooInterface)
+    assert spec is get_spec(FooInterface)
+    assert spec.interface is FooInterface
+    assert set(spec.methods) == {'foo'}
+    assert spec.methods['foo'].kinds == ('classmethod',)
+    assert str(spec.methods['foo'].signature) == '(a)'
+    assert [a.attr for a in spec.properties['baz'].accessors] == ['fget']
+    assert spec.attributes == {'bar', 'baz'}
+
+    with pytest.raises(TypeError):
+        spec.methods['qux'] = None
+    with pytest.raises(AttributeError):
+        spec.attributes = frozenset()
+
+
+def test_interface_spec_collected():
+    class FooInterface(Interface):
+        def foo(self):
+            pass
+
+    class Foo:
+        def foo(self):
+            pass
+
+    implements(FooInterface)(Foo)
+    assert get_spec(FooInterface).interface is FooInterface
+    assert isinstance(Foo(), FooInterface) and not isinstance(3, FooInterface)
+    assert conforms(Foo(), FooInterface) and not conforms(3, FooInterface)
+    interface_ref, impl_ref = weakref.ref(FooInterface), weakref.ref(Foo)
+    del FooInterface, Foo
+    gc.collect()    # the implementation, which registers the interface
+    gc.collect()
+    assert interface_ref() is None and impl_ref() is None
+
+
+def test_interface_spec_reused(monkeypatch):
+    class FooInterface(Interface):
+        def foo(self):
+            pass
+
+    get_spec(FooInterface)
+    monkeypatch.setattr('implements.compile_spec', None)
+
+    for _ in range(2):
+        @implements(FooInterface)
+        class FooImplementation:
+            def foo(self):
+                pass
+
+
+def test_members_index():
+    class Base:
+        a = 1
+
+        def foo(self):
+            pass
+
+    class Child(Base):
+        a = 2
+
+    members = get_members(Child)
+    assert members['a'] == 2
+    assert members['foo'] is Base.__dict__['foo']
+    assert members['__init__'] is object.__init__
+
+
+def test_members_descriptors_not_invoked():
+    calls = []
+
+    class Expensive:
+        def __get__(self, instance, owner):
+            calls.append(owner)
+            return self
+
+    class FooInterface(Interface):
+        a = None
+
+        def foo(self):
+            pass
+
+        @property
+        def bar(self):
+            pass
+
+    @implements(FooInterface)
+    class FooImplementation:
+        a = 1
+        expensive = Expensive()
+
+        def foo(self):
+            pass
+
+        @property
+        def bar(self):
+            pass
+
+        @classmethod
+        def baz(cls):
+            pass
+
+    assert calls == []
+    assert get_attributes(FooImplementation) == {'a', 'bar', 'expensive'}
+
+
+def test_implements_many():
+    class FooInterface(Interface):
+        def foo(self):
+            pass
+
+    class BarInterface(Interface):
+        bar = None
+
+    match = r'^Found 2 errors in implementation:\n- .+\n- .+\nwith .+'
+    with pytest.raises(NotImplementedError, match=match):
+        @implements(FooInterface, BarInterface)
+        class FooBarImplementationFail:           # skipcq: PYL-W0612
+            pass
+
+    with pytest.raises(ValueError):
+        @implements(FooInterface, BarInterface)
+        class FooBarImplementationBarSub(BarInterface):  # skipcq: PYL-W0612
+            def foo(self):
+                pass
+
+    @implements(FooInterface, BarInterface)
+    class FooBarImplementation:
+        bar = 1
+
+        def foo(self):
+            pass
+
+    with pytest.raises(TypeError):
+        implements()
+
+
+def test_mode_off(mode):
+    class FooInterface(Interface):
+        def foo(self):
+            pass
+
+    mode('off')
+    decorator = implements(FooInterface)
+
+    @decorator
+    class FooImplementation:
+        pass
+
+    assert decorator(FooImplementation) is FooImplementation
+
+
+def test_mode_warn(mode, caplog):
+    class FooInterface(Interface):
+        def foo(self):
+            pass
+
+    mode('warn')
+
+    @implements(FooInterface)
+    class FooImplementation:
+        pass
+
+    assert "must implement method 'foo(self)'" in caplog.text
+
+
+def test_mode_warn_hierarchy(mode, caplog):
+    class FooInterface(Interface):
+        def foo(self):
+            pass
+
+    mode('warn')
+
+    @implements(FooInterface)
+    class FooImplementation(FooInterface):
+        pass
+
+    @implements(FooInterface, lazy=True)
+    class FooLazyImplementation(FooInterface):
+        pass
+
+    FooLazyImplementation()
+    assert caplog.text.count('common classes between') == 2
+
+
+def test_mode_unknown(mode):
+    with pytest.raises(ValueError):
+        mode('loose')
+    assert get_mode() == 'strict'
+
+
+def test_mode_environment():
+    import subprocess
+
+    code = 'import implements; print(implements.get_mode())'
+    env = dict(os.environ, IMPLEMENTS_MODE='warn')
+    out = subprocess.check_output([sys.executable, '-c', code], env=env)
+    assert out.strip() == b'warn'
+
+    env.pop('IMPLEMENTS_MODE')
+    out = subprocess.check_output([sys.executable, '-O', '-c', code], env=env)
+    assert out.strip() == b'off'
+
+
+def test_lazy():
+    class FooInterface(Interface):
+        def foo(self):
+            pass
+
+    @implements(FooInterface, lazy=True)
+    class FooImplementationFail:
+        def __init__(self, a):
+            self.a = a
+
+    class FooImplementationFailChild(FooImplementationFail):
+        pass
+
+    for cls in (FooImplementationFailChild, FooImplementationFail):
+        with pytest.raises(NotImplementedError):
+            cls(1)
+
+    @implements(FooInterface, lazy=True)
+    class FooImplementationPass:
+        def __new__(cls, a):
+            instance = super().__new__(cls)
+            instance.a = a
+            return instance
+
+        def foo(self):
+            pass
+
+    def hooked():
+        return hasattr(FooImplementationPass.__new__, '__wrapped__')
+
+    assert hooked()
+    assert FooImplementationPass(1).a == 1
+    assert not hooked()
+    assert FooImplementationPass(2).a == 2
+
+    @implements(FooInterface, lazy=True)
+    class FooImplementationInit:
+        def __init__(self, a):
+            self.a = a
+
+        def foo(self):
+            pass
+
+    class FooImplementationInitChild(FooImplementationInit):
+        pass
+
+    assert FooImplementationInit(1).a == 1
+    assert FooImplementationInit(a=2).a == 2
+    assert FooImplementationInitChild(3).a == 3
+
+    @implements(FooInterface, lazy=True)
+    class FooImplementationNoInit:
+        def foo(self):
+            pass
+
+    FooImplementationNoInit()
+    assert '__new__' not in FooImplementationNoInit.__dict__
+    assert '__init__' not in FooImplementationNoInit.__dict__
+    with pytest.raises(TypeError):
+        FooImplementationNoInit(1)
+
+
+def test_lazy_signature():
+    class FooInterface(Interface):
+        def foo(self):
+            pass
+
+    class Base:
+        def __init__(self, a, b=2):
+            self.a = a
+
+    @implements(FooInterface, lazy=True)
+    class Foo(Base):
+        def foo(self):
+            pass
+
+    signature = inspect.signature(Base)
+    assert inspect.signature(Foo) == signature
+    assert Foo(1).a == 1
+    assert inspect.signature(Foo) == signature
+    assert '__init__' not in Foo.__dict__
+    assert '__new__' not in Foo.__dict__
+    assert Foo(2).a == 2
+
+
+def test_background():
+    class FooInterface(Interface):
+        def foo(self):
+            pass
+
+    configure(background=True)
+    try:
+        @implements(FooInterface)
+        class FooImplementationFail:
+            pass
+
+        @implements(FooInterface)
+        class FooImplementationPass:
+            def foo(self):
+                pass
+
+        class BarInterface(Interface):
+            pass
+
+        @implements(BarInterface)
+        class BarImplementationFail(BarInterface):
+            pass
+
+        match = r'^2 implementations failed verification:'
+        with pytest.raises(VerificationFailures, match=match) as excinfo:
+            wait()
+        assert isinstance(excinfo.value, NotImplementedError)
+        failures = excinfo.value.failures
+        assert [f.cls for f in failures if isinstance(
+            f, ImplementationError)] == [FooImplementationFail]
+        wait()
+    finally:
+        configure(background=False)
+
+
+@pytest.fixture
+def package(tmp_path, monkeypatch):
+    root = tmp_path / 'bulkpkg'
+    (root / 'sub').mkdir(parents=True)
+    (root / '__init__.py').write_text(
+        'from implements import Interface\n'
+        'class FooInterface(Interface):\n'
+        '    def foo(self):\n'
+        '        pass\n')
+    (root / 'good.py').write_text(
+        'from implements import implements\n'
+        'from bulkpkg import FooInterface\n'
+        '@implements(FooInterface)\n'
+        'class Good:\n'
+        '    def foo(self):\n'
+        '        pass\n')
+    (root / 'sub' / '__init__.py').write_text('')
+    (root / 'sub' / 'bad.py').write_text(
+        'from implements import implements\n'
+        'from bulkpkg import FooInterface\n'
+        '@implements(FooInterface)\n'
+        'class Bad:\n'
+        '    pass\n')
+    (root / 'sub' / 'broken.py').write_text('import nonexistent_module\n')
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield 'bulkpkg'
+    for name in list(sys.modules):
+        if name.startswith('bulkpkg'):
+            del sys.modules[name]
+
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_verify_package(package, jobs):
+    results = verify_package(package, jobs=jobs)
+    assert [(r.module, r.name, bool(r.errors)) for r in results] == [
+        ('bulkpkg.good', 'Good', False),
+        ('bulkpkg.sub.bad', 'Bad', True),
+        ('bulkpkg.sub.broken', None, True),
+    ]
+    assert results[0].interfaces == ('bulkpkg.FooInterface',)
+    assert "must implement method 'foo(self)'" in str(results[1].errors[0])
+
+
+def test_import_cost():
+    import subprocess
+
+    # the command line, the pools and the daemon import what they need
+    code = ('import sys, inspect, pkg_resources\n'
+            'loaded = set(sys.modules)\n'
+            'import implements\n'
+            'print(sorted(set(sys.modules) - loaded))\n')
+    out = subprocess.check_output([sys.executable, '-c', code]).decode()
+    for module in ('argparse', 'json', 'hashlib', 'socketserver',
+                   'multiprocessing', 'concurrent.futures',
+                   'importlib.metadata'):
+        assert repr(module) not in out
+
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_verify_package_imported(package, jobs, mode):
+    mode(mode='warn')
+    importlib.import_module('bulkpkg.sub.bad')
+    mode(mode='strict')
+
+    errors = verify_modules(['bulkpkg.sub.bad'], package)[0].errors
+    assert errors[0].kind == 'import'
+    assert 'was imported before verification' in str(errors[0])
+
+    results = verify_package(package, jobs=jobs)
+    assert [(r.module, r.name, bool(r.errors)) for r in results] == [
+        ('bulkpkg.good', 'Good', False),
+        ('bulkpkg.sub.bad', 'Bad', True),
+        ('bulkpkg.sub.broken', None, True),
+    ]
+
+
+def test_verify_package_cli(package, capsys):
+    assert main(['verify', package, '--jobs', '1']) == 1
+    out = capsys.readouterr().out
+    assert 'bulkpkg.sub.bad.Bad:' in out
+    assert 'Verified 2 implementations: 1 failed' in out
+    assert '1 modules could not be imported' in out
+
+
+def test_cache(tmp_path, monkeypatch):
+    class FooInterface(Interface):
+        bar = None
+
+        def foo(self, a: int) -> str:
+            pass
+
+    def make(annotation):
+        class FooImplementation:
+            bar = 1
+
+            def foo(self, a: annotation) -> str:
+                pass
+        return FooImplementation
+
+    configure(cache_dir=str(tmp_path))
+    try:
+        implements(FooInterface)(make(int))
+        assert len(list(tmp_path.glob('*/*'))) == 1
+
+        monkeypatch.setattr('implements.verify_methods', None)
+        implements(FooInterface)(make(int))
+
+        with pytest.raises(TypeError):
+            implements(FooInterface)(make(str))
+    finally:
+        configure(cache_dir='')
+
+
+def test_fingerprint():
+    class FooInterface(Interface):
+        def foo(self, a):
+            pass
+
+    def make(value):
+        class Foo:
+            def foo(self, a):
+                return value
+        return Foo
+
+    class Bar:
+        def foo(self, b):
+            pass
+
+    class Baz:
+        foo = functools.partial(print)
+
+    key = fingerprint((FooInterface,), make(1))
+    assert key == fingerprint((FooInterface,), make(2))
+    assert key != fingerprint((FooInterface,), Bar)
+    assert fingerprint((FooInterface,), Baz) is None
+
+
+@pytest.fixture
+def sources(tmp_path):
+    root = tmp_path / 'staticpkg'
+    root.mkdir()
+    (root / '__init__.py').write_text('from .interfaces import FooInterface\n')
+    (root / 'interfaces.py').write_text(
+        'import implements\n'
+        'class BaseInterface(implements.Interface):\n'
+        '    bar = None\n'
+        'class FooInterface(BaseInterface):\n'
+        '    @classmethod\n'
+        '    def foo(cls, a, *, b: int = 1) -> str:\n'
+        '        pass\n'
+        '    @property\n'
+        '    def baz(self):\n'
+        '        pass\n')
+    (root / 'impl.py').write_text(
+        'import nonexistent_module\n'
+        'from implements import implements\n'
+        'from staticpkg import FooInterface\n'
+        'class Base:\n'
+        '    bar = 2\n'
+        '@implements(FooInterface)\n'
+        'class Good(Base):\n'
+        '    @classmethod\n'
+        '    def foo(klass, a, *, b: int = 1) -> str:\n'
+        '        pass\n'
+        '    @property\n'
+        '    def baz(self):\n'
+        '        pass\n'
+        '@implements(FooInterface)\n'
+        'class Bad:\n'
+        '    def foo(self, a, *, b: int = 2) -> str:\n'
+        '        pass\n'
+        '    baz = 1\n'
+        '@implements(FooInterface)\n'
+        'class Unknown(nonexistent_module.Base):\n'
+        '    @classmethod\n'
+        '    def foo(cls, a, *, b: int = 1) -> str:\n'
+        '        pass\n')
+    (root / 'broken.py').write_text('class (:\n')
+    return str(root)
+
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_check_sources(sources, jobs):
+    results = check_sources([sources], jobs=jobs)
+    assert [(r.module, r.name) for r in results] == [
+        ('staticpkg.broken', None),
+        ('staticpkg.impl', 'Bad'),
+        ('staticpkg.impl', 'Good'),
+        ('staticpkg.impl', 'Unknown'),
+    ]
+    bad, good, unknown = results[1:]
+    assert bad.interfaces == ('staticpkg.interfaces.FooInterface',)
+    assert good.errors == unknown.errors == ()
+    assert tuple(str(e) for e in bad.errors) == (
+        "'Bad' must have class attribute 'bar' defined in interface "
+        "'FooInterface'",
+        "'Bad' must implement a getter for property 'baz' defined in "
+        "interface 'FooInterface'",
+        "'Bad' must implement 'foo' as a classmethod as defined in interface "
+        "'FooInterface'",
+        "'Bad' must implement method 'foo(a, *, b: int = 1) -> str' defined "
+        "in interface 'FooInterface'",
+    )
+
+
+def test_check_sources_cli(sources, capsys):
+    assert main(['check', sources, '-j', '1']) == 1
+    out = capsys.readouterr().out
+    assert 'staticpkg.impl.Bad:' in out
+    assert 'Verified 3 implementations: 1 failed' in out
+
+
+def test_check_sources_json(sources, capsys):
+    assert main(['check', sources, '-j', '1', '--json']) == 1
+    results = json.loads(capsys.readouterr().out)
+    errors = {r['name']: r['errors'] for r in results}
+    assert errors['Good'] == []
+    error, = errors[None]
+    assert error['kind'] == 'import'
+    assert error['member'] == 'staticpkg.broken'
+    assert error['message'].startswith('SyntaxError: ')
+
+
+def test_check_daemon(sources):
+    daemon = CheckDaemon([sources], jobs=1)
+    assert [r.name for r in daemon.query() if r.errors] == [None, 'Bad']
+    assert daemon.refresh() == []
+
+    impl = os.path.join(sources, 'impl.py')
+    with open(impl, 'a') as f:
+        f.write('class Unrelated:\n    pass\n')
+    assert daemon.refresh() == []
+
+    interfaces = os.path.join(sources, 'interfaces.py')
+    with open(interfaces) as f:
+        source = f.read()
+    with open(interfaces, 'w') as f:
+        f.write(source.replace('bar = None', 'qux = None'))
+    assert daemon.refresh() == [
+        'staticpkg.impl.Bad', 'staticpkg.impl.Good', 'staticpkg.impl.Unknown']
+    results = daemon.query([impl])
+    assert [(r.name, len(r.errors)) for r in results] == [
+        ('Bad', 4), ('Good', 1), ('Unknown', 0)]
+
+    os.remove(os.path.join(sources, 'broken.py'))
+    assert [r.name for r in daemon.query()] == ['Bad', 'Good', 'Unknown']
+
+
+def test_check_daemon_socket(sources, tmp_path, capsys):
+    address = str(tmp_path / 'implements.sock')
+    server = serve(CheckDaemon([sources], jobs=1), address)
+    try:
+        assert main(['query', '--socket', address,
+                     os.path.join(sources, 'impl.py')]) == 1
+        out = capsys.readouterr().out
+        assert 'staticpkg.impl.Bad:' in out
+        assert 'Verified 3 implementations: 1 failed' in out
+        assert main(['query', '--socket', address]) == 1
+        out = capsys.readouterr().out
+        assert 'staticpkg.broken' in out and 'SyntaxError' in out
+    finally:
+        server.shutdown()
+    assert not os.path.exists(address)
+
+
+def _wrapping(func):
+    @functools.wraps(func)
+    def inner(*args, **kwargs):
+        pass
+    return inner
+
+
+class SignatureFacts:
+    def a(self, x, y=1, *args, z, w: int = 2, **kwargs) -> str:
+        pass
+
+    def b(self, x, y=1, *args, w: int = 2, z, **kwargs) -> str:
+        pass
+
+    def c(self, x, y=2, *args, z, w: int = 2, **kwargs) -> str:
+        pass
+
+    def e(self, x, y):
+        pass
+
+    @classmethod
+    def f(cls, x, y):
+        pass
+
+    @staticmethod
+    def g(x, y):
+        pass
+
+    @classmethod
+    def h(*args):
+        pass
+
+    @_wrapping
+    def i(self, x, y):
+        pass
+
+
+@pytest.mark.parametrize('first', 'abcefgh')
+@pytest.mark.parametrize('second', 'abcefgh')
+def test_signature_facts(first, second):
+    first = getattr(SignatureFacts, first)
+    second = getattr(SignatureFacts, second)
+    facts = signature_facts(first) == signature_facts(second)
+    signature = inspect.signature(first) == inspect.signature(second)
+    assert facts == signature
+
+
+def test_signature_facts_unsupported():
+    assert signature_facts(SignatureFacts.i) is None
+    assert signature_facts(print) is None
+
+
+def test_signature_fast_path(monkeypatch):
+    class FooInterface(Interface):
+        def foo(self, a, *, b=1):
+            pass
+
+        @property
+        def bar(self) -> int:
+            pass
+
+    get_spec(FooInterface)
+    monkeypatch.setattr('inspect.signature', None)
+
+    @implements(FooInterface)
+    class FooImplementation:
+        def foo(self, a, *, b=1):
+            pass
+
+        @property
+        def bar(self) -> int:
+            pass
+
+    with pytest.raises(NotImplementedError):
+        @implements(FooInterface)
+        class FooImplementationFail:
+            def foo(self, a, *, b=2):
+                pass
+
+            @property
+            def bar(self) -> str:
+                pass
+
+
+def test_pytest_plugin(pytester):
+    pytester.makepyfile(test_ducks="""
+        from implements import Interface, implements
+
+        class FooInterface(Interface):
+            def foo(self):
+                pass
+
+        @implements(FooInterface)
+        class Good:
+            def foo(self):
+                pass
+
+        @implements(FooInterface)
+        class Bad:
+            pass
+
+        def test_nothing():
+            pass
+    """)
+    result = pytester.runpytest('-p', 'pytest_implements', '--implements')
+    result.assert_outcomes(passed=1, failed=1)
+    result.stdout.fnmatch_lines([
+        '*1 implementations failed verification:*',
+        "*'Bad' must implement method 'foo(self)'*",
+        '*slowest 5 implements verifications*',
+        '*s test_ducks.Good',
+    ])
+
+    result = pytester.runpytest('-p', 'pytest_implements')
+    result.assert_outcomes(errors=1)
+
+
+def test_pytest_plugin_enforce(pytester):
+    pytester.makeconftest("""
+        import implements
+
+        def pytest_configure(config):
+            implements.configure(enforce=1)
+
+        def pytest_unconfigure(config):
+            implements.configure(enforce=0)
+    """)
+    pytester.makepyfile(test_ducks="""
+        import pytest
+        from implements import Interface, implements
+
+        class FooInterface(Interface):
+            def foo(self, a: int):
+                pass
+
+        @implements(FooInterface)
+        class Good:
+            def foo(self, a: int):
+                pass
+
+        def test_enforced():
+            Good().foo(1)
+            with pytest.raises(TypeError):
+                Good().foo('1')
+    """)
+    result = pytester.runpytest('-p', 'pytest_implements', '--implements')
+    result.assert_outcomes(passed=2)
+
+
+def test_pytest_plugin_xdist_timings(pytester):
+    # a worker hands its timings over in `workeroutput`, which the
+    # controller receives when the node goes down
+    pytester.makeconftest("""
+        import types
+
+        def pytest_configure(config):
+            config.workeroutput = {}
+
+        def pytest_collection_finish(session):
+            plugin = session.config.pluginmanager.get_plugin(
+                'implements-batch')
+            node = types.SimpleNamespace(
+                workeroutput=session.config.workeroutput)
+            plugin.timings = []
+            plugin.pytest_testnodedown(node, None)
+    """)
+    pytester.makepyfile(test_ducks="""
+        from implements import Interface, implements
+
+        class FooInterface(Interface):
+            def foo(self):
+                pass
+
+        @implements(FooInterface)
+        class Good:
+            def foo(self):
+                pass
+    """)
+    result = pytester.runpytest('-p', 'pytest_implements', '--implements')
+    result.stdout.fnmatch_lines([
+        '*slowest 5 implements verifications*',
+        '*s test_ducks.Good',
+    ])
+
+
+def test_registry():
+    import gc
+
+    class FooInterface(Interface):
+        def foo(self):
+            pass
+
+    class BarInterface(Interface):
+        pass
+
+    @implements(BarInterface)
+    @implements(FooInterface)
+    class FooImplementation:
+        def foo(self):
+            pass
+
+    with pytest.raises(NotImplementedError):
+        @implements(FooInterface)
+        class FooImplementationFail:
+            pass
+
+    @implements(FooInterface, lazy=True)
+    class FooImplementationLazy:
+        def foo(self):
+            pass
+
+    assert get_implementations(FooInterface) == (FooImplementation,)
+    assert get_interfaces(FooImplementation) == (FooInterface, BarInterface)
+    assert get_interfaces(BarInterface) == ()
+
+    FooImplementationLazy()
+    assert set(get_implementations(FooInterface)) == {
+        FooImplementation, FooImplementationLazy}
+
+    del FooImplementation, FooImplementationLazy
+    gc.collect()
+    assert get_implementations(FooInterface) == ()
+
+
+def test_isinstance():
+    class BaseInterface(Interface):
+        pass
+
+    class FooInterface(BaseInterface):
+        def foo(self):
+            pass
+
+    class BarInterface(Interface):
+        pass
+
+    class FooImplementation:
+        def foo(self):
+            pass
+
+    class FooChild(FooImplementation):
+        pass
+
+    foo = FooChild()
+    assert not isinstance(foo, FooInterface)
+    implements(FooInterface)(FooImplementation)
+
+    assert isinstance(foo, FooInterface)
+    assert isinstance(foo, BaseInterface)
+    assert not isinstance(foo, BarInterface)
+    assert issubclass(FooImplementation, FooInterface)
+    assert issubclass(FooInterface, BaseInterface)
+    assert not issubclass(int, FooInterface)
+    assert not isinstance(1, FooInterface)
+    with pytest.raises(TypeError):
+        issubclass(1, FooInterface)
+
+
+def test_isinstance_abc():
+    class FooInterface(Interface, abc.ABC):
+        @abc.abstractmethod
+        def foo(self):
+            pass
+
+    assert get_spec(FooInterface).attributes == set()
+    assert not get_spec(FooInterface).slotted
+
+    @implements(FooInterface)
+    class Foo:
+        def foo(self):
+            pass
+
+    class Bar:
+        pass
+
+    assert isinstance(Foo(), FooInterface)
+    assert not isinstance(Bar(), FooInterface)
+    FooInterface.register(Bar)
+    assert isinstance(Bar(), FooInterface)
+    assert get_implementations(FooInterface) == (Foo,)
+
+
+def test_conforms():
+    class FooInterface(Interface):
+        def foo(self, a):
+            pass
+
+    class Foo:
+        def foo(self, a):
+            pass
+
+    class Bar:
+        def foo(self):
+            pass
+
+    assert conforms(Foo, FooInterface)
+    assert conforms(Foo(), FooInterface)
+    assert not conforms(Bar(), FooInterface)
+    assert not conforms(1, FooInterface)
+    assert not isinstance(Foo(), FooInterface)
+
+
+def test_conforms_is_cached(monkeypatch):
+    class FooInterface(Interface):
+        def foo(self):
+            pass
+
+    class Foo:
+        def foo(self):
+            pass
+
+    assert conforms(Foo(), FooInterface)
+    monkeypatch.setattr('implements.verify_methods', None)
+    assert conforms(Foo(), FooInterface)
+
+
+def test_accepts():
+    class FooInterface(Interface):
+        def foo(self):
+            pass
+
+    class Foo:
+        def foo(self):
+            pass
+
+    @accepts(a=FooInterface, c=FooInterface)
+    def func(a, b=None, *, c=None):
+        return a
+
+    foo = Foo()
+    assert func(foo) is foo
+    assert func(a=foo, c=foo) is foo
+    with pytest.raises(TypeError) as excinfo:
+        func(foo, c=1)
+    assert "argument 'c' must implement FooInterface, not int" in str(
+        excinfo.value)
+    with pytest.raises(TypeError):
+        func(1)
+
+    with pytest.raises(TypeError):
+        accepts(d=FooInterface)(func)
+
+
+@pytest.fixture
+def dispatch_interfaces():
+    class BaseInterface(Interface):
+        def base(self):
+            pass
+
+    class FooInterface(BaseInterface):
+        def foo(self):
+            pass
+
+    class BarInterface(Interface):
+        def bar(self):
+            pass
+
+    return BaseInterface, FooInterface, BarInterface
+
+
+def test_dispatch(dispatch_interfaces):
+    BaseInterface, FooInterface, BarInterface = dispatch_interfaces
+
+    @dispatch
+    def describe(obj):
+        return 'object'
+
+    @describe.register(BarInterface)
+    def _(obj):
+        return 'bar'
+
+    @describe.register(BaseInterface)
+    def _(obj):
+        return 'base'
+
+    @describe.register(FooInterface)
+    def _(obj):
+        return 'foo'
+
+    class Base:
+        def base(self):
+            pass
+
+    class FooBar:
+        def base(self):
+            pass
+
+        def foo(self):
+            pass
+
+        def bar(self):
+            pass
+
+    assert describe(Base()) == 'object'
+    implements(BaseInterface)(Base)
+    assert describe(Base()) == 'base'
+
+    implements(BaseInterface, BarInterface, FooInterface)(FooBar)
+    assert describe(FooBar()) == 'bar'
+
+    class FooBarChild(FooBar):
+        pass
+
+    implements(FooInterface)(FooBarChild)
+    assert describe(FooBarChild()) == 'foo'
+
+    describe.register(FooBarChild, lambda obj: 'child')
+    assert describe(FooBarChild()) == 'child'
+    assert describe.dispatch(FooBar)(None) == 'bar'
+    with pytest.raises(TypeError):
+        describe()
+
+
+def test_dispatch_plain_class():
+    class QuxInterface(Interface):
+        def qux(self):
+            pass
+
+    @dispatch
+    def describe(obj):
+        return 'object'
+
+    class Plain:
+        pass
+
+    describe.register(Plain, lambda obj: 'plain')
+
+    @implements(QuxInterface)
+    class Qux(Plain):
+        def qux(self):
+            pass
+
+    assert describe(Qux()) == 'plain'
+
+
+def test_plugins(tmp_path, monkeypatch):
+    (tmp_path / 'plugins_iface.py').write_text(
+        'from implements import Interface\n'
+        'class FooInterface(Interface):\n'
+        '    def foo(self):\n'
+        '        pass\n')
+    (tmp_path / 'plugins_good.py').write_text(
+        'class Good:\n'
+        '    def foo(self):\n'
+        '        pass\n')
+    (tmp_path / 'plugins_bad.py').write_text(
+        'class Bad:\n'
+        '    pass\n')
+    dist = tmp_path / 'fooplugins-1.0.dist-info'
+    dist.mkdir()
+    (dist / 'METADATA').write_text(
+        'Metadata-Version: 2.1\nName: fooplugins\nVersion: 1.0\n')
+    (dist / 'entry_points.txt').write_text(
+        '[plugins_iface.FooInterface]\n'
+        'good = plugins_good:Good\n'
+        'bad = plugins_bad:Bad\n')
+    monkeypatch.syspath_prepend(str(tmp_path))
+    import plugins_iface
+
+    found = plugins(plugins_iface.FooInterface)
+    assert sorted(found) == ['bad', 'good']
+    assert 'good' in found and 'missing' not in found
+    assert 'plugins_good' not in sys.modules
+
+    good = found['good']
+    assert good.__name__ == 'Good'
+    assert found['good'] is good
+    assert get_interfaces(good) == (plugins_iface.FooInterface,)
+    with pytest.raises(NotImplementedError):
+        found['bad']
+    with pytest.raises(KeyError):
+        found['missing']
+    for name in ('plugins_iface', 'plugins_good', 'plugins_bad'):
+        sys.modules.pop(name, None)
+
+
+@pytest.fixture
+def enforcing():
+    configure(enforce=1)
+    yield
+    configure(enforce=0)
+
+
+def test_enforce(enforcing):
+    class FooInterface(Interface):
+        def foo(self, a: int, *, b: typing.Optional[str] = None) -> str:
+            pass
+
+        @classmethod
+        def bar(cls, a: typing.List[int]):
+            pass
+
+        def plain(self, a):
+            pass
+
+    @implements(FooInterface)
+    class Foo:
+        def foo(self, a: int, *, b: typing.Optional[str] = None) -> str:
+            return a
+
+        @classmethod
+        def bar(cls, a: typing.List[int]):
+            return a
+
+        def plain(self, a):
+            return a
+
+    foo = Foo()
+    with pytest.raises(TypeError) as excinfo:
+        foo.foo(1)
+    assert 'foo() must return str, not int' in str(excinfo.value)
+    with pytest.raises(TypeError) as excinfo:
+        foo.foo('1')
+    assert "foo() argument 'a' must be int, not str" in str(excinfo.value)
+    with pytest.raises(TypeError) as excinfo:
+        foo.foo(1, b=2)
+    assert "argument 'b' must be str or NoneType" in str(excinfo.value)
+
+    assert Foo.bar([1]) == [1]
+    with pytest.raises(TypeError):
+        Foo.bar((1,))
+
+    assert Foo.__dict__['plain'].__name__ == 'plain'
+    assert not hasattr(Foo.__dict__['plain'], '__wrapped__')
+
+
+def test_enforce_generators(enforcing):
+    class FooInterface(Interface):
+        def gen(self, a: int):
+            yield
+
+        async def coro(self, a: int) -> int:
+            pass
+
+        async def agen(self, a: int):
+            yield
+
+    @implements(FooInterface)
+    class Foo:
+        def gen(self, a: int):
+            yield a
+
+        async def coro(self, a: int) -> int:
+            return str(a)
+
+        async def agen(self, a: int):
+            yield a
+
+    foo = Foo()
+    assert list(foo.gen(1)) == [1]
+    with pytest.raises(TypeError):
+        list(foo.gen('1'))
+    assert inspect.isgeneratorfunction(Foo.gen)
+
+    assert inspect.iscoroutinefunction(Foo.coro)
+    with pytest.raises(TypeError) as excinfo:
+        foo.coro(1).send(None)
+    assert 'coro() must return int, not str' in str(excinfo.value)
+
+    assert inspect.isasyncgenfunction(Foo.agen)
+    with pytest.raises(TypeError):
+        foo.agen('1').asend(None).send(None)
+
+
+def test_enforce_sampling():
+    class FooInterface(Interface):
+        def foo(self, a: int):
+            pass
+
+    configure(enforce=3)
+    try:
+        @implements(FooInterface)
+        class Foo:
+            def foo(self, a: int):
+                pass
+    finally:
+        configure(enforce=0)
+
+    foo = Foo()
+    with pytest.raises(TypeError):
+        foo.foo('a')
+    foo.foo('a')
+    foo.foo('a')
+    with pytest.raises(TypeError):
+        foo.foo('a')
+
+
+def test_stats(caplog):
+    class FooInterface(Interface):
+        def foo(self):
+            pass
+
+    class Foo:
+        def foo(self):
+            pass
+
+    class Bar:
+        pass
+
+    reset_stats()
+    implements(FooInterface)(Foo)
+    with pytest.raises(NotImplementedError):
+        implements(FooInterface)(Bar)
+
+    result = stats()
+    assert result['verifications'] == 2
+    assert result['failures'] == 1
+    assert result['cache_hits'] == result['cache_misses'] == 0
+    assert sorted(result['phases']) == sorted([
+        'verify_class_hierarchy', 'verify_methods', 'verify_properties',
+        'verify_attributes'])
+    assert result['total'] >= sum(result['phases'].values()) > 0
+    assert [name for name, _ in result['slowest']] == sorted(
+        result['classes'], key=lambda name: -result['classes'][name]['total'])
+    assert 'tests.test_stats.<locals>.Foo' in result['classes']
+
+    configure(budget=1e-9)
+    try:
+        implements(FooInterface)(Foo)
+        implements(FooInterface)(Foo)
+    finally:
+        configure(budget=0)
+    warnings = [r for r in caplog.records if 'over the budget' in r.message]
+    assert len(warnings) == 1
+    assert 'test_stats.<locals>.Foo' in warnings[0].message
+
+    reset_stats()
+    assert stats()['verifications'] == 0
+
+
+def test_hooks():
+    class FooInterface(Interface):
+        def foo(self):
+            pass
+
+    class Foo:
+        def foo(self):
+            pass
+
+    class Bar:
+        pass
+
+    events = []
+    for event in ('start', 'end', 'failure'):
+        add_hook(event, events.append)
+    try:
+        implements(FooInterface)(Foo)
+        with pytest.raises(NotImplementedError):
+            implements(FooInterface)(Bar)
+    finally:
+        for event in ('start', 'end', 'failure'):
+            remove_hook(event, events.append)
+
+    assert [(e.event, e.cls) for e in events] == [
+        ('start', Foo), ('end', Foo),
+        ('start', Bar), ('end', Bar), ('failure', Bar)]
+    assert events[0].interfaces == (FooInterface,)
+    assert events[0].duration is None and events[0].errors is None
+    assert events[1].duration >= 0 and events[1].errors == ()
+    assert len(events[4].errors) == 1
+    assert "must implement method 'foo(self)'" in str(events[4].errors[0])
+
+    with pytest.raises(ValueError):
+        add_hook('unknown', events.append)
+
+
+_audited = []
+
+
+@pytest.mark.skipif(not hasattr(sys, 'audit'), reason='requires sys.audit')
+def test_audit_events():
+    class FooInterface(Interface):
+        def foo(self):
+            pass
+
+    class Foo:
+        def foo(self):
+            pass
+
+    sys.addaudithook(lambda event, args: event.startswith('implements.') and
+                     _audited.append((event, args[1])))
+    implements(FooInterface)(Foo)
+    assert ('implements.start', Foo) in _audited
+    assert ('implements.end', Foo) in _audited
+    del _audited[:]
+
+
+@pytest.fixture
+def annotations():
+    yield configure
+    configure(annotations='exact')
+
+
+def test_annotations_string(annotations):
+    class FooInterface(Interface):
+        def foo(self, a: 'List[int]',  # noqa: F821
+                b: typing.Dict[str, int]) -> 'None':
+            pass
+
+    def make(annotation):
+        class FooImplementation:
+            def foo(self, a: annotation, b: 'dict[str, int]') -> None:
+                pass
+        return FooImplementation
+
+    with pytest.raises(NotImplementedError):
+        implements(FooInterface)(make('list[int]'))
+
+    annotations(annotations='string')
+    implements(FooInterface)(make('list[int]'))
+    implements(FooInterface)(make(typing.List[int]))
+    with pytest.raises(NotImplementedError):
+        implements(FooInterface)(make('list[str]'))
+
+
+@pytest.mark.parametrize('first, second, equal', [
+    ('typing.Literal[1.5]', 'Literal[1.5]', True),
+    ('Literal[1.5]', 'Literal[2.5]', False),
+    ("Literal['a b']", 'Literal["a b"]', True),
+    ("Literal['a b']", "Literal['ab']", False),
+    ("List['mod.Foo']", 'typing.List[Foo]', True),
+])
+def test_annotations_string_literals(first, second, equal):
+    assert (normalize_annotation(first, 'string') ==
+            normalize_annotation(second, 'string')) is equal
+
+
+def test_annotations_resolve(annotations):
+    class FooInterface(Interface):
+        def foo(self, a: 'typing.Optional[typing.List[int]]'
+                ) -> 'Missing':  # noqa: F821
+            pass
+
+        @property
+        def bar(self) -> 'typing.Dict[str, int]':
+            pass
+
+    def make(annotation):
+        class FooImplementation:
+            def foo(self, a: annotation) -> 'Missing':  # noqa: F821
+                pass
+
+            @property
+            def bar(self) -> typing.Dict[str, int]:
+                pass
+        return FooImplementation
+
+    annotations(annotations='resolve')
+    implements(FooInterface)(make(typing.Union[None, typing.List[int]]))
+    implements(FooInterface)(make('typing.Optional[typing.List[int]]'))
+    with pytest.raises(NotImplementedError):
+        implements(FooInterface)(make(typing.Optional[typing.List[str]]))
+
+    with pytest.raises(ValueError):
+        configure(annotations='unknown')
+
+
+def test_violations():
+    class FooInterface(Interface):
+        bar = None
+
+        def foo(self, a):
+            pass
+
+    class Foo:
+        def foo(self):
+            pass
+
+    with pytest.raises(ImplementationError) as excinfo:
+        implements(FooInterface)(Foo)
+    error = excinfo.value
+    assert isinstance(error, NotImplementedError)
+    assert error.cls is Foo
+    assert all(isinstance(e, Violation) for e in error.errors)
+    assert [(e.kind, e.member, e.cls, e.interface) for e in error.errors] == [
+        ('method', 'foo', 'Foo', 'FooInterface'),
+        ('attribute', 'bar', 'Foo', 'FooInterface'),
+    ]
+    method = error.errors[0]
+    assert method.expected == inspect.signature(FooInterface.foo)
+    assert method.actual == Foo.foo
+    assert str(method) == (
+        "'Foo' must implement method 'foo(self, a)' defined in interface "
+        "'FooInterface'")
+    assert method.as_dict() == {
+        'kind': 'method', 'member': 'foo', 'expected': '(self, a)',
+        'actual': str(Foo.foo), 'cls': 'Foo', 'interface': 'FooInterface',
+        'message': str(method)}
+    assert str(error).startswith('Found 2 errors in implementation:\n- ')
+
+
+def test_violations_are_formatted_lazily(mode, monkeypatch):
+    class FooInterface(Interface):
+        def foo(self):
+            pass
+
+    def format_errors(errors, cls):
+        raise AssertionError('formatted')
+
+    monkeypatch.setattr('implements.format_errors', format_errors)
+    logger = logging.getLogger('implements')
+    level = logger.level
+    logger.setLevel(logging.ERROR)
+    mode('warn')
+    try:
+        @implements(FooInterface)
+        class Foo:                              # skipcq: PYL-W0612
+            pass
+    finally:
+        logger.setLevel(level)
+
+
+def test_verify_package_json(package, capsys):
+    assert main(['verify', package, '--jobs', '1', '--json']) == 1
+    results = json.loads(capsys.readouterr().out)
+    errors = {r['name']: r['errors'] for r in results}
+    assert errors['Good'] == []
+    assert [(e['kind'], e['member']) for e in errors['Bad']] == [
+        ('method', 'foo')]
+    assert errors[None][0]['kind'] == 'import'
+
+
+def test_threads():
+    class FooInterface(Interface):
+        def foo(self):
+            pass
+
+    def make():
+        class Foo:
+            def foo(self):
+                pass
+        return Foo
+
+    reset_stats()
+    barrier = threading.Barrier(8)
+    classes = [[make() for _ in range(50)] for _ in range(8)]
+
+    def decorate(batch):
+        barrier.wait()
+        for cls in batch:
+            implements(FooInterface)(cls)
+            assert isinstance(cls(), FooInterface)
+
+    threads = [threading.Thread(target=decorate, args=(batch,))
+               for batch in classes]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert set(get_implementations(FooInterface)) == {
+        cls for batch in classes for cls in batch}
+    assert stats()['verifications'] == 400
+
+
+def test_lazy_threads(monkeypatch):
+    class FooInterface(Interface):
+        def foo(self):
+            pass
+
+    @implements(FooInterface, lazy=True)
+    class Foo:
+        def foo(self):
+            pass
+
+    verified = threading.Event()
+    verify = sys.modules['implements'].verify_implementation
+
+    def slow_verify(interfaces, cls, members=None):
+        time.sleep(0.05)
+        errors = verify(interfaces, cls, members)
+        verified.set()
+        return errors
+
+    monkeypatch.setattr('implements.verify_implementation', slow_verify)
+    created = []
+
+    def instantiate():
+        Foo()
+        created.append(verified.is_set())
+
+    threads = [threading.Thread(target=instantiate) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert created == [True] * 4
+
+
+def test_annotated_attributes():
+    class EchoInterface(Interface):
+        echoes: bool
+        volume: int = 1
+
+    assert get_spec(EchoInterface).attributes == {'echoes', 'volume'}
+
+    with pytest.raises(NotImplementedError) as excinfo:
+        @implements(EchoInterface)
+        class Mute:
+            volume = 0
+    assert [e.member for e in excinfo.value.errors] == ['echoes']
+
+    @implements(EchoInterface)
+    class Echo:
+        echoes = True
+        volume = 0
+
+    @implements(EchoInterface)
+    class AnnotatedEcho:
+        echoes: bool
+        volume: int
+
+        def __init__(self):
+            self.echoes = True
+            self.volume = 2
+
+    @implements(EchoInterface)
+    class SlottedEcho:
+        __slots__ = ('echoes', 'volume')
+
+
+def test_slots():
+    class ValueInterface(Interface):
+        __slots__ = ()
+        echoes: bool
+
+    class CompactValueInterface(ValueInterface):
+        pass
+
+    assert get_spec(ValueInterface).attributes == {'echoes'}
+    assert get_spec(CompactValueInterface).slotted
+
+    class Base:
+        __slots__ = ()
+
+    @implements(CompactValueInterface)
+    class Value(Base):
+        __slots__ = ('echoes',)
+
+    class Loose:
+        pass
+
+    with pytest.raises(NotImplementedError) as excinfo:
+        @implements(ValueInterface)
+        class LooseValue(Loose):
+            __slots__ = ('echoes',)
+    error, = excinfo.value.errors
+    assert error.kind == 'slots' and error.actual == ('Loose',)
+    assert str(error) == (
+        "'LooseValue' must not have a per-instance __dict__ as required by "
+        "the __slots__ of interface 'ValueInterface'. Classes adding one: "
+        "[Loose]")
+
+    with pytest.raises(NotImplementedError):
+        @implements(ValueInterface)
+        class DictValue:
+            __slots__ = ('echoes', '__dict__')
+
+    assert not conforms(Loose(), ValueInterface)
+
+    class SizedInterface(collections.abc.Sized):
+        def __len__(self):
+            pass
+
+    assert not get_spec(SizedInterface).slotted
+
+
+def test_check_sources_slots(tmp_path):
+    (tmp_path / 'values.py').write_text(
+        'from implements import Interface, implements\n'
+        'class ValueInterface(Interface):\n'
+        '    __slots__ = ()\n'
+        '    echoes: bool\n'
+        'class Base:\n'
+        '    __slots__ = ()\n'
+        '@implements(ValueInterface)\n'
+        'class Value(Base):\n'
+        '    __slots__ = ("echoes",)\n'
+        '@implements(ValueInterface)\n'
+        'class Annotated:\n'
+        '    echoes: bool\n'
+        '@implements(ValueInterface)\n'
+        'class Missing:\n'
+        '    __slots__ = ()\n')
+    results = {r.name: r.errors for r in check_sources([str(tmp_path)])}
+    assert results['Value'] == ()
+    assert [(e.kind, e.actual) for e in results['Annotated']] == [
+        ('slots', ('Annotated',))]
+    assert [(e.kind, e.member) for e in results['Missing']] == [
+        ('attribute', 'echoes')]